@@ -65,7 +65,7 @@ def list_esp_ports() -> List[Tuple[str, str]]:
         prog = AutoTQFirmwareProgrammer()
         ports = prog.list_available_ports()
         # Filter for ESP/AutoTQ devices (marked with 🎯)
-        esp_ports = [(p, desc) for p, desc in ports if '🎯' in desc]
+        esp_ports = [(p, desc) for p, desc, is_esp32 in ports if is_esp32]
         return esp_ports
     except Exception as e:
         log(f"Error listing ports: {e}", Colors.FAIL)
@@ -6,6 +6,8 @@ Python client for authentication and device management with the actual FastAPI s
 import os
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import getpass
 from typing import Optional, Dict, Any
 from datetime import datetime
@@ -30,6 +32,15 @@ class AutoTQClient:
         self.token: Optional[str] = None
         self.session = requests.Session()
         self.session.verify = verify_ssl
+        # Keep-alive pool sized for concurrent per-device calls (avoids a new TLS handshake per request).
+        # Connection setup is retried for every method (nothing was sent yet, so it is safe even
+        # for POSTs); 502/503/504 only for idempotent ones (GET/HEAD/PUT/DELETE, urllib3's
+        # default allowed_methods). Failed reads are never retried.
+        retry = Retry(total=3, connect=3, read=0, redirect=0, status=3,
+                      status_forcelist=[502, 503, 504], raise_on_status=False, backoff_factor=0.3)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         
         # Load existing API key if available (backward-compatible read)
         self._load_api_key()
@@ -20,10 +20,8 @@ from typing import Dict, Any, Optional, List
 from autotq_client import AutoTQClient
 from autotq_quick_check import (
     _list_esp_ports,
-    read_mac_via_status,
+    read_identity,
     read_mac,
-    read_device_info_via_serial,
-    read_fw_version_via_serial,
     ensure_pcb_stage,
     _run_measure_on_port,
     _print_measure_summary,
@@ -74,10 +72,10 @@ def discover_devices_and_pcbs(client: AutoTQClient, stage_label: str) -> Dict[st
             time.sleep(2)
             ports = _list_esp_ports()
     for port in ports:
-        mac = read_mac_via_status(port) or read_mac(port) or None
-        dinfo = read_device_info_via_serial(port) or {}
-        fw = dinfo.get("firmware_version") or read_fw_version_via_serial(port)
-        hw = dinfo.get("hardware_version")
+        ident = read_identity(port)
+        mac = ident.get("mac") or read_mac(port) or None
+        fw = ident.get("firmware_version")
+        hw = ident.get("hardware_version")
         if not mac:
             log(f"[USB] Skipping {port}: MAC not readable")
             continue
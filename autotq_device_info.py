@@ -6,10 +6,8 @@ Simple utility to show MAC addresses and firmware versions of connected AutoTQ d
 import sys
 from autotq_quick_check import (
     _list_esp_ports,
-    read_mac_via_status,
+    read_identity,
     read_mac,
-    read_device_info_via_serial,
-    read_fw_version_via_serial,
 )
 
 
@@ -38,17 +36,16 @@ def main():
             print(f"Device #{idx}: {port}")
             print("-" * 70)
             
-            # Try to read MAC address
-            mac = read_mac_via_status(port) or read_mac(port)
+            # MAC, firmware and hardware in one serial session
+            ident = read_identity(port)
+            mac = ident.get("mac") or read_mac(port)
             if mac:
                 print(f"  MAC Address:      {mac}")
             else:
                 print(f"  MAC Address:      (unable to read)")
             
-            # Try to read device info
-            dinfo = read_device_info_via_serial(port) or {}
-            fw = dinfo.get("firmware_version") or read_fw_version_via_serial(port)
-            hw = dinfo.get("hardware_version")
+            fw = ident.get("firmware_version")
+            hw = ident.get("hardware_version")
             
             if fw:
                 print(f"  Firmware Version: {fw}")
@@ -33,6 +33,17 @@ except ImportError:
     HAS_TQDM = False
     print("⚠️  Warning: tqdm not installed. Progress bars will be basic.")
 
+# Common ESP32-S3 USB vendor/product IDs (native USB and popular USB-UART bridges)
+ESP32_USB_IDS = frozenset([
+    (0x303A, 0x1001),  # Espressif ESP32-S3
+    (0x303A, 0x0002),  # Espressif ESP32-S3 CDC
+    (0x10C4, 0xEA60),  # Silicon Labs CP2102/CP2109
+    (0x1A86, 0x7523),  # QinHeng Electronics CH340
+    (0x1A86, 0x55D4),  # QinHeng Electronics CH9102
+    (0x0403, 0x6001),  # FTDI FT232R
+    (0x067B, 0x2303),  # Prolific PL2303
+])
+
 
 class AutoTQFirmwareProgrammer:
     """AutoTQ Firmware Programmer for ESP32-S3 devices"""
@@ -361,12 +372,16 @@ class AutoTQFirmwareProgrammer:
         self.log(f"Latest firmware found: {firmware_info['version']} ({firmware_info['binary_file'].name})", "SUCCESS")
         return firmware_info
     
-    def list_available_ports(self, include_all: bool = False, quiet: bool = False) -> List[Tuple[str, str]]:
+    def list_available_ports(self, include_all: bool = False, quiet: bool = False) -> List[Tuple[str, str, bool]]:
         """List available serial ports that might be ESP32-S3 devices
         
         Args:
             include_all: If True, include ALL COM ports even if they don't match ESP32 criteria
             quiet: If True, suppress log messages (for repeated scanning)
+            
+        Returns:
+            List of (port, description, is_esp32) tuples; is_esp32 marks likely
+            ESP32-S3 devices (the ones tagged 🎯 in the description)
         """
         ports = []
         current_platform = platform.system().lower()
@@ -379,19 +394,9 @@ class AutoTQFirmwareProgrammer:
                           ['esp32', 'esp32-s3', 'usb serial', 'cdc', 'uart', 'ch340', 'cp210', 'ft232', 'silicon labs', 'serial'])
             
             # Check for common ESP32-S3 USB vendor/product IDs
-            esp32_s3_ids = [
-                (0x303A, 0x1001),  # Espressif ESP32-S3
-                (0x303A, 0x0002),  # Espressif ESP32-S3 CDC
-                (0x10C4, 0xEA60),  # Silicon Labs CP2102/CP2109
-                (0x1A86, 0x7523),  # QinHeng Electronics CH340
-                (0x1A86, 0x55D4),  # QinHeng Electronics CH9102
-                (0x0403, 0x6001),  # FTDI FT232R
-                (0x067B, 0x2303),  # Prolific PL2303
-            ]
-            
             vid_pid_match = False
             if port.vid is not None and port.pid is not None:
-                vid_pid_match = (port.vid, port.pid) in esp32_s3_ids
+                vid_pid_match = (port.vid, port.pid) in ESP32_USB_IDS
             
             # Enhanced device description for different platforms
             device_description = port.description
@@ -413,14 +418,15 @@ class AutoTQFirmwareProgrammer:
                 port_description = f"{device_description} [{port.device}] {vid_pid_str}"
                 
                 # Mark potential ESP32-S3 devices
-                if vid_pid_match or 'esp32' in device_description.lower():
+                is_esp32_s3 = vid_pid_match or 'esp32' in device_description.lower()
+                if is_esp32_s3:
                     port_description = f"🎯 {port_description}"
                 elif is_esp32:
                     port_description = f"📟 {port_description}"
                 else:
                     port_description = f"❓ {port_description}"
                 
-                ports.append((port.device, port_description))
+                ports.append((port.device, port_description, is_esp32_s3))
                 if not quiet:
                     self.log(f"Found potential device: {port.device} - {device_description}")
         
@@ -442,7 +448,7 @@ class AutoTQFirmwareProgrammer:
             return selected_port
         elif len(ports) > 1:
             self.log("Multiple devices found. Please specify which one to use:")
-            for i, (port, desc) in enumerate(ports, 1):
+            for i, (port, desc, _) in enumerate(ports, 1):
                 print(f"  {i}. {desc}")
             
             try:
@@ -1187,7 +1193,7 @@ class AutoTQFirmwareProgrammer:
             ports = self.list_available_ports()
             if ports:
                 print(f"📟 Detected devices: {len(ports)}")
-                for port, desc in ports:
+                for port, desc, _ in ports:
                     print(f"   • {desc}")
             else:
                 print("📟 No devices detected")
@@ -1220,7 +1226,7 @@ class AutoTQFirmwareProgrammer:
                 elif choice == '2':
                     if ports:
                         print("\nAvailable devices:")
-                        for i, (port, desc) in enumerate(ports, 1):
+                        for i, (port, desc, _) in enumerate(ports, 1):
                             print(f"  {i}. {desc}")
                         
                         try:
@@ -1238,7 +1244,7 @@ class AutoTQFirmwareProgrammer:
                 elif choice == '3':
                     if ports:
                         print("\nTesting device connections...")
-                        for port, desc in ports:
+                        for port, desc, _ in ports:
                             print(f"Testing {port}...")
                             if self.test_esptool_connection(port):
                                 print(f"✅ {port}: ESP32-S3 confirmed")
@@ -1249,7 +1255,7 @@ class AutoTQFirmwareProgrammer:
                 elif choice == '4':
                     if ports:
                         print("\nAvailable devices:")
-                        for i, (port, desc) in enumerate(ports, 1):
+                        for i, (port, desc, _) in enumerate(ports, 1):
                             print(f"  {i}. {desc}")
                         
                         try:
@@ -1278,7 +1284,7 @@ class AutoTQFirmwareProgrammer:
                 elif choice == '9':
                     if ports:
                         print("\nAvailable devices:")
-                        for i, (port, desc) in enumerate(ports, 1):
+                        for i, (port, desc, _) in enumerate(ports, 1):
                             print(f"  {i}. {desc}")
                         
                         try:
@@ -1298,7 +1304,7 @@ class AutoTQFirmwareProgrammer:
                     if ports:
                         print("\n🚀 BATCH MODE: Program multiple devices")
                         print("Available devices:")
-                        for i, (port, desc) in enumerate(ports, 1):
+                        for i, (port, desc, _) in enumerate(ports, 1):
                             print(f"  {i}. {desc}")
                         
                         print("\nSelect devices to program:")
@@ -1311,10 +1317,10 @@ class AutoTQFirmwareProgrammer:
                             
                             selected_ports = []
                             if selection == 'all':
-                                selected_ports = [port for port, desc in ports]
+                                selected_ports = [port for port, _, _ in ports]
                                 print(f"📋 Selected all {len(selected_ports)} devices")
                             elif selection == 'auto':
-                                selected_ports = [port for port, desc in ports if '🎯' in desc]
+                                selected_ports = [port for port, _, is_esp32 in ports if is_esp32]
                                 print(f"📋 Auto-selected {len(selected_ports)} ESP32-S3 devices")
                             else:
                                 # Parse comma-separated numbers
@@ -1341,7 +1347,7 @@ class AutoTQFirmwareProgrammer:
                 elif choice == 'r':
                     if ports:
                         print("\nAvailable devices:")
-                        for i, (port, desc) in enumerate(ports, 1):
+                        for i, (port, desc, _) in enumerate(ports, 1):
                             print(f"  {i}. {desc}")
                         
                         try:
@@ -1360,7 +1366,7 @@ class AutoTQFirmwareProgrammer:
                 elif choice == 'd':
                     if ports:
                         print("\nAvailable devices:")
-                        for i, (port, desc) in enumerate(ports, 1):
+                        for i, (port, desc, _) in enumerate(ports, 1):
                             print(f"  {i}. {desc}")
                         
                         try:
@@ -1380,7 +1386,7 @@ class AutoTQFirmwareProgrammer:
                     if ports:
                         print("\n🚀 BATCH MODE: Program multiple devices")
                         print("Available devices:")
-                        for i, (port, desc) in enumerate(ports, 1):
+                        for i, (port, desc, _) in enumerate(ports, 1):
                             print(f"  {i}. {desc}")
                         
                         print("\nSelect devices to program:")
@@ -1393,10 +1399,10 @@ class AutoTQFirmwareProgrammer:
                             
                             selected_ports = []
                             if selection == 'all':
-                                selected_ports = [port for port, desc in ports]
+                                selected_ports = [port for port, _, _ in ports]
                                 print(f"📋 Selected all {len(selected_ports)} devices")
                             elif selection == 'auto':
-                                selected_ports = [port for port, desc in ports if '🎯' in desc]
+                                selected_ports = [port for port, _, is_esp32 in ports if is_esp32]
                                 print(f"📋 Auto-selected {len(selected_ports)} ESP32-S3 devices")
                             else:
                                 # Parse comma-separated numbers
@@ -1423,7 +1429,7 @@ class AutoTQFirmwareProgrammer:
                 elif choice == 'r':
                     if ports:
                         print("\nAvailable devices:")
-                        for i, (port, desc) in enumerate(ports, 1):
+                        for i, (port, desc, _) in enumerate(ports, 1):
                             print(f"  {i}. {desc}")
                         
                         try:
@@ -1442,7 +1448,7 @@ class AutoTQFirmwareProgrammer:
                 elif choice == 'd':
                     if ports:
                         print("\nAvailable devices:")
-                        for i, (port, desc) in enumerate(ports, 1):
+                        for i, (port, desc, _) in enumerate(ports, 1):
                             print(f"  {i}. {desc}")
                         
                         try:
@@ -1611,12 +1617,12 @@ Examples:
             else:
                 # Auto-detect ESP32-S3 devices  
                 ports = programmer.list_available_ports()
-                esp32_ports = [port for port, desc in ports if '🎯' in desc]
+                esp32_ports = [port for port, _, is_esp32 in ports if is_esp32]
                 
                 if esp32_ports:
                     print(f"🚀 BATCH MODE: Auto-detected {len(esp32_ports)} ESP32-S3 devices")
                     for port in esp32_ports:
-                        matching_desc = next(desc for p, desc in ports if p == port)
+                        matching_desc = next(desc for p, desc, _ in ports if p == port)
                         print(f"   • {matching_desc}")
                     
                     results = programmer.batch_program_devices(esp32_ports, production_mode=args.production)
@@ -24,16 +24,34 @@ Usage examples:
 
 import argparse
 import json
+import sys
 from datetime import datetime
 from typing import Any, Dict, Optional, List, Tuple
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 try:
     import serial  # type: ignore
 except Exception:
     serial = None  # Will warn at runtime if used without install
 
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None  # Fall back to stdlib json
+
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _encode_json_line(obj: Dict[str, Any]) -> bytes:
+        return orjson.dumps(obj) + b"\n"
+else:
+    _json_loads = json.loads
+
+    def _encode_json_line(obj: Dict[str, Any]) -> bytes:
+        return (json.dumps(obj) + "\n").encode("utf-8")
+
 from autotq_client import AutoTQClient
 from urllib.parse import urlparse, urlunparse
 from contextlib import redirect_stdout, redirect_stderr
@@ -42,6 +60,7 @@ import io
 # Thread-safe registry of currently detected devices
 from autotq_firmware_programmer import AutoTQFirmwareProgrammer
 from autotq_device_programmer import AutoTQDeviceProgrammer
+from autotq_quick_check import _open_serial_safely
 import math
 
 # Remember the last detected MAC during watch mode to prefill Create PCB
@@ -53,6 +72,12 @@ DEVICE_LOCK = threading.Lock()
 WATCHER_THREAD: Optional[threading.Thread] = None
 WATCHER_STOP = threading.Event()
 
+# Bound once at import; used on every serial open
+_SERIAL_PARAMS = AutoTQDeviceProgrammer.SERIAL_PARAMS
+
+# Fixed-width row layout for the measure-sequence --all table
+_MEASURE_ROW_FMT = "%-17s %-6s %7s  %8s  %7s  %8s  %8s  %9s"
+
 
 def ensure_authenticated(client: AutoTQClient, username: Optional[str], password: Optional[str]) -> bool:
     if client.is_authenticated():
@@ -186,13 +211,10 @@ def cmd_get(client: AutoTQClient, args: argparse.Namespace) -> int:
 
 def _list_current_macs() -> List[Tuple[str, str]]:
     """Return list of (mac, port). Only items with a known MAC are included."""
+    # Copy under the lock, filter outside it so the watcher is never held up
     with DEVICE_LOCK:
-        items = []
-        for port, info in DEVICE_REGISTRY.items():
-            mac = info.get("mac")
-            if mac:
-                items.append((mac, port))
-        return items
+        snapshot = list(DEVICE_REGISTRY.items())
+    return [(info.get("mac"), port) for port, info in snapshot if info.get("mac")]
 
 
 def select_mac_from_devices(prompt_title: str = "Select MAC") -> Optional[str]:
@@ -644,8 +666,8 @@ def run_watch_loop(args: argparse.Namespace) -> int:
             # Silence verbose scanning output
             with suppress_output():
                 ports = prog.list_available_ports()
-            # Only keep 🎯 ports
-            esp_ports = [p for p, desc in ports if '🎯' in desc]
+            # Only keep ESP32-S3 (🎯) ports
+            esp_ports = [p for p, _, is_esp32 in ports if is_esp32]
 
             # Detect new ports
             for port in esp_ports:
@@ -658,8 +680,7 @@ def run_watch_loop(args: argparse.Namespace) -> int:
                     ser = None
                     if args.hold_open:
                         try:
-                            params = AutoTQDeviceProgrammer.SERIAL_PARAMS
-                            ser = serial.Serial(port, **params)
+                            ser = serial.Serial(port, **_SERIAL_PARAMS)
                             print(f"🔗 Held open connection on {port}")
                         except Exception as e:
                             print(f"⚠️ Could not open serial on {port}: {e}")
@@ -702,7 +723,8 @@ def _watcher_bg_loop(interval: float) -> None:
         try:
             with suppress_output():
                 ports = prog.list_available_ports()
-            esp_ports = [p for p, desc in ports if '🎯' in desc]
+            # Interned so registry lookups reuse the cached string hash
+            esp_ports = [sys.intern(p) for p, _, is_esp32 in ports if is_esp32]
 
             # New ports
             for port in esp_ports:
@@ -745,70 +767,76 @@ def _pick_port_for_mac(target_mac: Optional[str]) -> Optional[str]:
 
 
 def _pretty_measure_output(data: Dict[str, Any]) -> None:
-    print("\n=== Measure Sequence ===")
-    status = data.get("status")
-    print(f"Status: {status}")
     # idle: voltage + current
     idle = data.get("idle", {}) if isinstance(data.get("idle"), dict) else {}
     v = idle.get("voltage_v")
     i = idle.get("current_a")
-    print(f"- idle:")
-    if v is not None:
-        print(f"    Voltage: {v:.3f} V")
-    if i is not None:
-        print(f"    Current: {i*1000:.2f} mA")
+    idle_block = (
+        "- idle:\n"
+        + (f"    Voltage: {v:.3f} V\n" if v is not None else "")
+        + (f"    Current: {i*1000:.2f} mA\n" if i is not None else "")
+    )
 
     # pump_on: voltage + pump driver current
     pump = data.get("pump_on", {}) if isinstance(data.get("pump_on"), dict) else {}
     v = pump.get("voltage_v")
     pd = pump.get("pump_driver_mA")
-    print(f"- pump_on:")
-    if v is not None:
-        print(f"    Voltage: {v:.3f} V")
-    if pd is not None:
-        print(f"    Pump current: {pd:.2f} mA")
+    pump_block = (
+        "- pump_on:\n"
+        + (f"    Voltage: {v:.3f} V\n" if v is not None else "")
+        + (f"    Pump current: {pd:.2f} mA\n" if pd is not None else "")
+    )
 
     # valve_on: voltage + valve driver current
     valve = data.get("valve_on", {}) if isinstance(data.get("valve_on"), dict) else {}
     v = valve.get("voltage_v")
     vd = valve.get("valve_driver_mA")
-    print(f"- valve_on:")
-    if v is not None:
-        print(f"    Voltage: {v:.3f} V")
-    if vd is not None:
-        print(f"    Valve current: {vd:.2f} mA")
-    print()
+    valve_block = (
+        "- valve_on:\n"
+        + (f"    Voltage: {v:.3f} V\n" if v is not None else "")
+        + (f"    Valve current: {vd:.2f} mA\n" if vd is not None else "")
+    )
+
+    # Single write for the whole report
+    print(f"\n=== Measure Sequence ===\nStatus: {data.get('status')}\n{idle_block}{pump_block}{valve_block}")
+
+
+def _table_cell(value: Any) -> Any:
+    """Render a measurement for the --all table: blank for None, otherwise the raw value."""
+    return '' if value is None else value
 
 
 def cmd_measure_sequence(args: argparse.Namespace) -> int:
-    # If --all, run against all known devices sequentially and print a compact table
+    # If --all, run against all known devices concurrently and print a compact table
     if getattr(args, 'all', False):
-        with DEVICE_LOCK:
-            targets = [(info.get('mac'), port) for port, info in DEVICE_REGISTRY.items() if info.get('mac')]
+        targets = _list_current_macs()
         if not targets:
             print("❌ No connected devices.")
             return 1
-        rows = []
-        for mac, port in targets:
-            result = _run_measure_on_port(port, args)
-            if result:
+        # Print the header up front and each row as its device finishes
+        print("\nMAC               PORT   IDLE(V)  IDLE(mA)  PUMP(V)  PUMP(mA)  VALVE(V)  VALVE(mA)")
+        # Each port is an independent serial fd with blocking I/O, so threads overlap the waits.
+        # Rows are printed only from this thread (as_completed), one whole line per call; a
+        # worker's own open/timeout error line can still appear between them.
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            futures = {executor.submit(_run_measure_on_port, port, args): (mac, port) for mac, port in targets}
+            for future in as_completed(futures):
+                mac, port = futures[future]
+                result = future.result()
+                if not result:
+                    continue
                 idle = result.get('idle', {}) if isinstance(result.get('idle'), dict) else {}
                 pump = result.get('pump_on', {}) if isinstance(result.get('pump_on'), dict) else {}
                 valve = result.get('valve_on', {}) if isinstance(result.get('valve_on'), dict) else {}
-                rows.append({
-                    'mac': mac,
-                    'port': port,
-                    'idle_v': idle.get('voltage_v'),
-                    'idle_i_mA': (idle.get('current_a') or 0) * 1000,
-                    'pump_v': pump.get('voltage_v'),
-                    'pump_i_mA': pump.get('pump_driver_mA'),
-                    'valve_v': valve.get('voltage_v'),
-                    'valve_i_mA': valve.get('valve_driver_mA'),
-                })
-        # Print compact table
-        print("\nMAC               PORT   IDLE(V)  IDLE(mA)  PUMP(V)  PUMP(mA)  VALVE(V)  VALVE(mA)")
-        for r in rows:
-            print(f"{r['mac']:<17} {r['port']:<6} {r['idle_v'] if r['idle_v'] is not None else '':>7}  {r['idle_i_mA'] if r['idle_i_mA'] is not None else '':>8}  {r['pump_v'] if r['pump_v'] is not None else '':>7}  {r['pump_i_mA'] if r['pump_i_mA'] is not None else '':>8}  {r['valve_v'] if r['valve_v'] is not None else '':>8}  {r['valve_i_mA'] if r['valve_i_mA'] is not None else '':>9}")
+                print(_MEASURE_ROW_FMT % (
+                    mac, port,
+                    _table_cell(idle.get('voltage_v')),
+                    _table_cell((idle.get('current_a') or 0) * 1000),
+                    _table_cell(pump.get('voltage_v')),
+                    _table_cell(pump.get('pump_driver_mA')),
+                    _table_cell(valve.get('voltage_v')),
+                    _table_cell(valve.get('valve_driver_mA')),
+                ), flush=True)
         return 0
 
     # Single device path
@@ -823,46 +851,83 @@ def cmd_measure_sequence(args: argparse.Namespace) -> int:
     return 0
 
 
-def _run_measure_on_port(port: str, args: argparse.Namespace) -> Optional[Dict[str, Any]]:
-    params = AutoTQDeviceProgrammer.SERIAL_PARAMS
+def _read_json_reply(ser, deadline: float, expected_cmd: str) -> Optional[Dict[str, Any]]:
+    """Read newline-framed JSON from ser until a reply for expected_cmd with a status arrives.
+
+    Returns None if the deadline passes first. All framing for device replies lives
+    here so the loop can be swapped for a compiled implementation without touching callers.
+    """
+    buf = bytearray()
+    # Block in the driver for the first byte, then drain whatever else is queued
+    while time.time() < deadline:
+        ser.timeout = max(0.0, deadline - time.time())
+        chunk = ser.read(max(1, ser.in_waiting))
+        if not chunk:
+            break
+        buf.extend(chunk)
+        start = 0
+        while True:
+            nl = buf.find(b'\n', start)
+            if nl == -1:
+                break
+            # Frame on raw bytes; both json backends decode UTF-8 input themselves,
+            # and a malformed line simply fails the parse below
+            line = bytes(buf[start:nl]).strip()
+            start = nl + 1
+            if not line:
+                continue
+            try:
+                obj = _json_loads(line)
+                if obj.get("command") == expected_cmd and obj.get("status"):
+                    return obj
+            except Exception:
+                continue
+        # Keep only the trailing partial line
+        del buf[:start]
+    return None
+
+
+def _wait_serial_settled(ser, first_byte_s: float = 0.5, quiet_s: float = 0.2, max_s: float = 2.0) -> None:
+    """Gate the first command on the port being idle instead of a fixed boot delay.
+
+    Waits up to first_byte_s for any byte; silence means no reset happened and the device is
+    ready. Output means it is booting, so drain until quiet_s passes with no new bytes
+    (capped at max_s, the old fixed settle).
+    """
     try:
-        ser = serial.Serial(port, **params)
-        time.sleep(2)
-    except Exception as e:
-        print(f"❌ Failed to open serial {port}: {e}")
+        ser.reset_input_buffer()
+        ser.timeout = first_byte_s
+        if not ser.read(1):
+            return
+        deadline = time.time() + max_s
+        ser.timeout = quiet_s
+        while time.time() < deadline and ser.read(max(1, ser.in_waiting)):
+            pass
+        ser.reset_input_buffer()
+    except Exception:
+        pass
+
+
+def _run_measure_on_port(port: str, args: argparse.Namespace) -> Optional[Dict[str, Any]]:
+    port = sys.intern(port)
+    # Opened with DTR/RTS deasserted; on Linux the kernel still raises both on open, so boards
+    # with an auto-reset circuit may reboot anyway
+    ser = _open_serial_safely(port, _SERIAL_PARAMS)
+    if ser is None:
+        print(f"❌ Failed to open serial {port}")
         return None
 
     try:
+        _wait_serial_settled(ser)
         cmd = {
             "command": "measure_sequence",
             "settle_ms": int(getattr(args, 'settle_ms', 500)),
             "pump_ms": int(getattr(args, 'pump_ms', 3000)),
             "valve_ms": int(getattr(args, 'valve_ms', 2000)),
         }
-        ser.write((json.dumps(cmd) + "\n").encode("utf-8"))
-
-        deadline = time.time() + 20
-        buffer = ""
-        result_obj: Optional[Dict[str, Any]] = None
-        while time.time() < deadline:
-            if ser.in_waiting > 0:
-                data = ser.read(ser.in_waiting).decode('utf-8', errors='ignore')
-                buffer += data
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        obj = json.loads(line)
-                        if obj.get("command") == "measure_sequence" and obj.get("status"):
-                            result_obj = obj
-                            break
-                    except Exception:
-                        continue
-            if result_obj:
-                break
-            time.sleep(0.05)
+        ser.write(_encode_json_line(cmd))
+
+        result_obj = _read_json_reply(ser, time.time() + 20, "measure_sequence")
         if not result_obj:
             print(f"❌ No measure_sequence result received from {port}")
             return None
@@ -11,7 +11,7 @@ import time
 import argparse
 import platform
 from pathlib import Path
-from datetime import datetime
+from types import MappingProxyType
 from typing import Optional, List, Tuple
 
 # Import our existing programmers
@@ -33,10 +33,39 @@ try:
 except Exception:
     list_ports = None  # type: ignore
 
+# Host OS never changes during a run; resolve it once
+_PLATFORM = platform.system()
+_PLATFORM_LOWER = _PLATFORM.lower()
+
+_EMOJI_MAP = MappingProxyType({
+    "INFO": "ℹ️ ",
+    "SUCCESS": "✅ ",
+    "WARNING": "⚠️ ",
+    "ERROR": "❌ ",
+    "PROGRESS": "🔄 ",
+    "DEVICE": "📟 ",
+    "FLASH": "⚡ ",
+    "AUDIO": "🎵 "
+})
+
+# (epoch second, formatted "%H:%M:%S") of the last log timestamp
+_last_ts = [0, ""]
+
+
+def _ts() -> str:
+    """Return the current wall-clock time as HH:MM:SS, reformatting at most once per second"""
+    s = int(time.time())
+    if s != _last_ts[0]:
+        _last_ts[0] = s
+        _last_ts[1] = time.strftime("%H:%M:%S", time.localtime(s))
+    return _last_ts[1]
+
 
 class AutoTQProgrammer:
     """All-in-One AutoTQ Device Programmer"""
     
+    PORT_CACHE_TTL = 0.25  # seconds
+    
     def __init__(self, firmware_dir: str = None, audio_dir: str = None):
         """
         Initialize the combined AutoTQ programmer
@@ -53,8 +82,11 @@ class AutoTQProgrammer:
         self.device_programmer = AutoTQDeviceProgrammer(audio_dir=str(self.audio_dir))
         self.ppk = None  # type: ignore
         
-        current_platform = platform.system()
-        print(f"🚀 AutoTQ All-in-One Programmer initialized ({current_platform})")
+        # Short-lived cache of the port scan (detection, selection and batch all enumerate)
+        self._ports: List[Tuple[str, str, bool]] = []
+        self._ports_ts = 0.0
+        
+        print(f"🚀 AutoTQ All-in-One Programmer initialized ({_PLATFORM})")
         print(f"📦 Firmware directory: {self.firmware_dir.absolute()}")
         print(f"🎵 Audio directory: {self.audio_dir.absolute()}")
         
@@ -63,18 +95,8 @@ class AutoTQProgrammer:
     
     def log(self, message: str, level: str = "INFO"):
         """Log a message with timestamp and emoji"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        emoji_map = {
-            "INFO": "ℹ️ ",
-            "SUCCESS": "✅ ",
-            "WARNING": "⚠️ ",
-            "ERROR": "❌ ",
-            "PROGRESS": "🔄 ",
-            "DEVICE": "📟 ",
-            "FLASH": "⚡ ",
-            "AUDIO": "🎵 "
-        }
-        emoji = emoji_map.get(level, "")
+        timestamp = _ts()
+        emoji = _EMOJI_MAP.get(level, "")
         print(f"[{timestamp}] {emoji} {message}")
     
     def check_requirements(self) -> bool:
@@ -104,6 +126,19 @@ class AutoTQProgrammer:
         self.log("All requirements met", "SUCCESS")
         return True
 
+    def _ports_cached(self) -> List[Tuple[str, str, bool]]:
+        """Return available ports, reusing a scan made within the last 250 ms"""
+        now = time.monotonic()
+        if self._ports_ts and now - self._ports_ts < self.PORT_CACHE_TTL:
+            return self._ports
+        self._ports = self.firmware_programmer.list_available_ports()
+        self._ports_ts = now
+        return self._ports
+
+    def _invalidate_ports_cache(self):
+        """Force the next port lookup to rescan (devices re-enumerate after flashing)"""
+        self._ports_ts = 0.0
+
     # --- PPK helpers ---
     def _find_ppk_comport(self) -> Optional[str]:
         try:
@@ -178,24 +213,23 @@ class AutoTQProgrammer:
         self.log("Scanning for AutoTQ devices...", "PROGRESS")
         
         # Get available ports
-        ports = self.firmware_programmer.list_available_ports()
+        ports = self._ports_cached()
         
         if not ports:
             self.log("No devices detected", "ERROR")
-            current_platform = platform.system().lower()
-            if current_platform == "linux":
+            if _PLATFORM_LOWER == "linux":
                 self.log("💡 Linux: Ensure device is connected and user has serial permissions", "INFO")
                 self.log("💡 Add user to dialout group: sudo usermod -a -G dialout $USER", "INFO")
-            elif current_platform == "windows":
+            elif _PLATFORM_LOWER == "windows":
                 self.log("💡 Windows: Check Device Manager for COM ports", "INFO")
             return None
         
         # Filter for ESP32-S3 devices (marked with 🎯)
-        esp32_ports = [port for port, desc in ports if '🎯' in desc]
+        esp32_ports = [port for port, _, is_esp32 in ports if is_esp32]
         
         if len(esp32_ports) == 1:
             selected_port = esp32_ports[0]
-            port_desc = next(desc for port, desc in ports if port == selected_port)
+            port_desc = next(desc for port, desc, _ in ports if port == selected_port)
             self.log(f"Auto-detected ESP32-S3 device: {port_desc}", "SUCCESS")
             return selected_port
         elif len(esp32_ports) > 1:
@@ -205,7 +239,7 @@ class AutoTQProgrammer:
         else:
             # No ESP32-S3 devices, but other serial devices found
             self.log(f"Found {len(ports)} serial device(s) but none appear to be ESP32-S3", "WARNING")
-            for port, desc in ports:
+            for port, desc, _ in ports:
                 self.log(f"  • {desc}", "INFO")
             return None
     
@@ -216,13 +250,16 @@ class AutoTQProgrammer:
         
         self.log("🏭 Production audio settings: Optimized JavaScript-style transfer enabled", "SUCCESS")
     
-    def program_device_complete(self, port: str = None, production_mode: bool = True) -> bool:
+    def program_device_complete(self, port: str = None, production_mode: bool = True,
+                                skip_probe: bool = False) -> bool:
         """
         Complete device programming: firmware + audio files
         
         Args:
             port: Serial port (auto-detect if None)
             production_mode: Use fast production settings (default: True)
+            skip_probe: Skip the esptool connection test (port already identified
+                as ESP32-S3 by auto-detection)
             
         Returns:
             True if both firmware and audio programming succeeded
@@ -235,6 +272,7 @@ class AutoTQProgrammer:
             if not port:
                 self.log("Device auto-detection failed", "ERROR")
                 return False
+            skip_probe = True
         
         self.log("=" * 60, "INFO")
         self.log(f"🚀 STARTING COMPLETE DEVICE PROGRAMMING", "INFO")
@@ -255,8 +293,8 @@ class AutoTQProgrammer:
         self.log("\n⚡ STEP 1: FIRMWARE PROGRAMMING", "FLASH")
         self.log("-" * 40, "INFO")
         
-        # Test connection first
-        if not self.firmware_programmer.test_esptool_connection(port):
+        # Test connection first (flashing reports connection errors itself)
+        if not skip_probe and not self.firmware_programmer.test_esptool_connection(port):
             self.log(f"Cannot connect to ESP32-S3 on {port}", "ERROR")
             return False
         
@@ -268,6 +306,8 @@ class AutoTQProgrammer:
             smart_erase=True,  # Always use smart erase for speed
             production_mode=production_mode
         )
+        # Device may re-enumerate on reboot, so the cached port list is stale
+        self._invalidate_ports_cache()
         
         if not firmware_success:
             self.log("Firmware programming failed", "ERROR")
@@ -324,12 +364,14 @@ class AutoTQProgrammer:
         
         return True
     
-    def batch_program_devices(self, production_mode: bool = True) -> bool:
+    def batch_program_devices(self, production_mode: bool = True, on_failure: str = "abort") -> bool:
         """
         Program all detected ESP32-S3 devices in batch
         
         Args:
             production_mode: Use production optimizations for speed (default: True)
+            on_failure: "continue" or "abort" after a failed device when stdin is not
+                a TTY (interactive runs still ask)
             
         Returns:
             True if all devices programmed successfully
@@ -337,8 +379,8 @@ class AutoTQProgrammer:
         self.log("🚀 BATCH MODE: Scanning for multiple devices...", "PROGRESS")
         
         # Get all ESP32-S3 devices
-        ports = self.firmware_programmer.list_available_ports()
-        esp32_ports = [port for port, desc in ports if '🎯' in desc]
+        ports = self._ports_cached()
+        esp32_ports = [port for port, _, is_esp32 in ports if is_esp32]
         
         if not esp32_ports:
             self.log("No ESP32-S3 devices found for batch programming", "ERROR")
@@ -360,7 +402,13 @@ class AutoTQProgrammer:
                 self.log(f"❌ Device {i} ({port}): Programming failed", "ERROR")
                 
                 # Ask user if they want to continue
-                if i < len(esp32_ports):
+                if i < len(esp32_ports) and not sys.stdin.isatty():
+                    # Nobody to answer the prompt (CI / orchestrator)
+                    if on_failure != "continue":
+                        self.log("Batch programming aborted after failure (--on-failure=abort)", "WARNING")
+                        break
+                    self.log("Continuing with remaining devices (--on-failure=continue)", "INFO")
+                elif i < len(esp32_ports):
                     try:
                         continue_choice = input(f"❓ Device {port} failed. Continue with remaining devices? (y/n): ")
                         if continue_choice.lower() not in ['y', 'yes']:
@@ -389,35 +437,22 @@ class AutoTQProgrammer:
     
     def interactive_device_selection(self) -> Optional[str]:
         """Interactive device selection when multiple devices are found"""
-        ports = self.firmware_programmer.list_available_ports()
+        ports = self._ports_cached()
         
         if not ports:
             self.log("No devices found", "ERROR")
             return None
         
         print("\n📟 Available devices:")
-        esp32_ports = []
-        other_ports = []
-        
-        for port, desc in ports:
-            if '🎯' in desc:
-                esp32_ports.append((port, desc))
-            else:
-                other_ports.append((port, desc))
-        
-        device_index = 1
-        
-        if esp32_ports:
-            print("  ESP32-S3 devices (recommended):")
-            for port, desc in esp32_ports:
-                print(f"    {device_index}. {desc}")
-                device_index += 1
+        # ESP32-S3 devices first (stable sort keeps scan order within each group)
+        ports = sorted(ports, key=lambda p: not p[2])
         
-        if other_ports:
-            print("  Other USB serial devices:")
-            for port, desc in other_ports:
-                print(f"    {device_index}. {desc}")
-                device_index += 1
+        for device_index, (port, desc, is_esp32) in enumerate(ports, 1):
+            if device_index == 1 and is_esp32:
+                print("  ESP32-S3 devices (recommended):")
+            elif not is_esp32 and (device_index == 1 or ports[device_index - 2][2]):
+                print("  Other USB serial devices:")
+            print(f"    {device_index}. {desc}")
         
         try:
             choice = input(f"\nEnter device number (1-{len(ports)}), or 'auto' for batch mode: ").strip()
@@ -436,12 +471,13 @@ class AutoTQProgrammer:
             self.log("Selection cancelled", "WARNING")
             return None
     
-    def run_auto_program(self, production_mode: bool = True) -> bool:
+    def run_auto_program(self, production_mode: bool = True, on_failure: str = "abort") -> bool:
         """
         Main auto-programming function
         
         Args:
             production_mode: Enable production optimizations (default: True)
+            on_failure: Non-interactive batch failure policy ("continue" or "abort")
             
         Returns:
             True if programming succeeded
@@ -453,7 +489,8 @@ class AutoTQProgrammer:
         
         if port:
             # Single device detected - program it
-            return self.program_device_complete(port=port, production_mode=production_mode)
+            return self.program_device_complete(port=port, production_mode=production_mode,
+                                                skip_probe=True)
         else:
             # Multiple devices or no devices - let user choose
             selected = self.interactive_device_selection()
@@ -461,7 +498,7 @@ class AutoTQProgrammer:
             if not selected:
                 return False
             elif selected == 'batch':
-                return self.batch_program_devices(production_mode=production_mode)
+                return self.batch_program_devices(production_mode=production_mode, on_failure=on_failure)
             else:
                 return self.program_device_complete(port=selected, production_mode=production_mode)
 
@@ -506,6 +543,8 @@ Development mode features (--dev):
                        help="Program all detected ESP32-S3 devices")
     parser.add_argument("--check-only", action="store_true",
                        help="Only check requirements and available devices")
+    parser.add_argument("--on-failure", choices=["continue", "abort"], default="abort",
+                       help="Batch behavior after a failed device when not run from a terminal (default: abort)")
     
     # Keep --production for backward compatibility but make it default
     parser.add_argument("--production", action="store_true",
@@ -546,7 +585,8 @@ Development mode features (--dev):
             else:
                 print("🚀 BATCH DEVELOPMENT MODE: Programming all devices with verification")
             
-            success = programmer.batch_program_devices(production_mode=production_mode)
+            success = programmer.batch_program_devices(production_mode=production_mode,
+                                                       on_failure=args.on_failure)
             sys.exit(0 if success else 1)
             
         else:
@@ -556,7 +596,8 @@ Development mode features (--dev):
             else:
                 print("🐌 DEVELOPMENT MODE: Slower programming with verification")
             
-            success = programmer.run_auto_program(production_mode=production_mode)
+            success = programmer.run_auto_program(production_mode=production_mode,
+                                                  on_failure=args.on_failure)
             sys.exit(0 if success else 1)
     
     except KeyboardInterrupt:
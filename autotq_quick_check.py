@@ -15,6 +15,8 @@ Usage:
 Optional:
   --interval <seconds>  Polling interval (default 1.5)
   --once                Run once and exit (default behavior)
+  -y, --yes             Never prompt; take defaults (stage factory, skip plots)
+  --prompt-timeout <s>  Take a prompt's default after <s> seconds without input
 
 Output format:
   [OK]  COM71  MAC=AA:BB:...  FW=v1.7.14 (up-to-date)
@@ -23,76 +25,187 @@ Output format:
 """
 
 import argparse
+import functools
+import importlib.util
 import json
+import math
+import re
+import select
+import sys
 import time
+import threading
+from array import array
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from typing import Dict, Any, Optional, List, Tuple
-from contextlib import redirect_stdout, redirect_stderr
-import io
+from contextlib import suppress
+from queue import Queue, Empty
 
 try:
     import serial  # type: ignore
 except Exception:
     serial = None
 
-from autotq_firmware_programmer import AutoTQFirmwareProgrammer
+from autotq_firmware_programmer import AutoTQFirmwareProgrammer, ESP32_USB_IDS
 from autotq_device_programmer import AutoTQDeviceProgrammer
 from autotq_client import AutoTQClient
-try:
-    # Nordic PPK2 control API (pip install ppk2_api)
-    from ppk2_api.ppk2_api import PPK2_API  # type: ignore
-except Exception:
-    PPK2_API = None  # type: ignore
+
+_SERIAL_PARAMS = AutoTQDeviceProgrammer.SERIAL_PARAMS
+
+# Nordic PPK2 control API (pip install ppk2_api); imported by _get_ppk2_api() on first use
+PPK2_API = None  # type: ignore
 try:
     from serial.tools import list_ports  # type: ignore
 except Exception:
     list_ports = None  # type: ignore
+try:
+    # In-process esptool for read_mac (avoids a Python + esptool cold start per device)
+    from esptool.cmds import detect_chip as _esptool_detect_chip  # type: ignore
+    from esptool.util import FatalError as _EsptoolFatalError  # type: ignore
+except Exception:
+    _esptool_detect_chip = None  # type: ignore
+    _EsptoolFatalError = None  # type: ignore
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None  # Fall back to stdlib json
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+# Request bodies serialized straight to UTF-8 bytes (orjson) and sent with data=
+_json_dumps = orjson.dumps if orjson is not None else (lambda obj: json.dumps(obj).encode('utf-8'))
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+try:
+    # Linux udev hotplug notifications (pip install pyudev)
+    import pyudev  # type: ignore
+except Exception:
+    pyudev = None  # type: ignore
 
 # Keep a persistent handle to the PPK so power stays enabled
 GLOBAL_PPK = None  # type: ignore
 GLOBAL_PPK_VOLTAGE_MV = 4200
 VERBOSE_SERIAL = False
 PPK_MEASURE_ONLY = False
-try:
-    import matplotlib.pyplot as plt  # type: ignore
-    HAS_MPL = True
-except Exception:
-    HAS_MPL = False
+# Non-interactive prompt handling (--yes / --prompt-timeout)
+ASSUME_YES = False
+PROMPT_TIMEOUT_S = 0.0
+# Pre-encoded device commands (the firmware parser is newline-delimited JSON)
+_CMD_STATUS = b'{"command":"get_status"}\n'
+_CMD_VERSION = b'{"command":"version"}\n'
+# measure_sequence phase timings (device side); also used to window PPK averages
+_MEASURE_SETTLE_MS = 500
+_MEASURE_PUMP_MS = 3000
+_MEASURE_VALVE_MS = 2000
+_CMD_MEASURE_SEQUENCE = (
+    '{"command":"measure_sequence","settle_ms":%d,"pump_ms":%d,"valve_ms":%d}\n'
+    % (_MEASURE_SETTLE_MS, _MEASURE_PUMP_MS, _MEASURE_VALVE_MS)
+).encode('ascii')
+# Only the numeric/boolean fields vary per call
+_CMD_SHUTDOWN_FMT = '{"command":"shutdown","seconds":%d,"defer_until_usb_unplug":%s}\n'
+# MAC address text (aa:bb:cc:dd:ee:ff) inside a reply value or an esptool output line
+_MAC_VALUE_RE = re.compile(r"([0-9A-Fa-f]{2}(:[0-9A-Fa-f]{2}){5})")
+# matplotlib costs hundreds of ms to import; only check it is installed until a plot is drawn
+HAS_MPL = importlib.util.find_spec("matplotlib") is not None
+plt = None  # type: ignore
+
+
+def _get_plt():
+    """Import matplotlib.pyplot on first use; returns None if it cannot be loaded."""
+    global plt, HAS_MPL
+    if plt is None and HAS_MPL:
+        try:
+            import matplotlib.pyplot as _pyplot  # type: ignore
+            plt = _pyplot
+        except Exception:
+            HAS_MPL = False
+    return plt
+
+
+def _get_ppk2_api():
+    """Import PPK2_API on first use; returns None if ppk2_api is not installed."""
+    global PPK2_API
+    if PPK2_API is None:
+        try:
+            from ppk2_api.ppk2_api import PPK2_API as _api  # type: ignore
+            PPK2_API = _api
+        except Exception:
+            return None
+    return PPK2_API
+
+
+# Output is muted per thread, not by swapping the process-wide streams: the first
+# suppress_output installs these wrappers once, and they drop writes only from threads
+# currently inside a suppress_output block, so other probe workers keep printing
+_suppress_tls = threading.local()
+_SUPPRESS_INSTALL_LOCK = threading.Lock()
+
+
+class _ThreadMutedStream:
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        if getattr(_suppress_tls, 'depth', 0):
+            return len(text)
+        return self._stream.write(text)
+
+    def flush(self):
+        if not getattr(_suppress_tls, 'depth', 0):
+            self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
 
 
 class suppress_output:
     def __enter__(self):
-        self._stdout = io.StringIO()
-        self._stderr = io.StringIO()
-        self._exit1 = redirect_stdout(self._stdout)
-        self._exit2 = redirect_stderr(self._stderr)
-        self._exit1.__enter__()
-        self._exit2.__enter__()
+        with _SUPPRESS_INSTALL_LOCK:
+            if not isinstance(sys.stdout, _ThreadMutedStream):
+                sys.stdout = _ThreadMutedStream(sys.stdout)
+            if not isinstance(sys.stderr, _ThreadMutedStream):
+                sys.stderr = _ThreadMutedStream(sys.stderr)
+        _suppress_tls.depth = getattr(_suppress_tls, 'depth', 0) + 1
         return self
     def __exit__(self, exc_type, exc, tb):
-        try:
-            self._exit2.__exit__(exc_type, exc, tb)
-            self._exit1.__exit__(exc_type, exc, tb)
-        finally:
-            self._stdout.close()
-            self._stderr.close()
+        _suppress_tls.depth -= 1
+
+
+# Device/API workers print from several threads; whole lines (and multi-line blocks taken
+# under the lock) stay together
+_PRINT_LOCK = threading.RLock()
+
+
+def _print(*args, **kwargs) -> None:
+    with _PRINT_LOCK:
+        print(*args, **kwargs)
+
+
+# Same folder names the original scan accepted: v2, v1.7, v1.7.0, v1.2.3.4 ...
+_VER_RE = re.compile(r'^v(\d+(?:\.\d+)*)$')
 
 
 def find_latest_version(firmware_dir: Path) -> Optional[str]:
     if not firmware_dir.exists():
         return None
-    versions: List[Tuple[List[int], Path]] = []
-    for p in firmware_dir.iterdir():
-        if p.is_dir() and p.name.startswith('v'):
-            try:
-                parts = [int(x) for x in p.name[1:].split('.')]
-                versions.append((parts, p))
-            except Exception:
-                pass
-    if not versions:
-        return None
-    versions.sort(key=lambda x: x[0], reverse=True)
-    return versions[0][1].name
+    # Directory mtime changes when a version folder is added/removed, invalidating the cache
+    return _find_latest_version_cached(str(firmware_dir), firmware_dir.stat().st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=4)
+def _find_latest_version_cached(firmware_dir: str, _mtime_ns: int) -> Optional[str]:
+    best: Optional[Path] = None
+    best_key: Tuple[Tuple[int, ...], str] = ((), '')
+    for p in Path(firmware_dir).iterdir():
+        m = _VER_RE.match(p.name)
+        if not m:
+            continue
+        # Numeric parts compare like the original list sort (v1.7 < v1.7.0); equal numbers
+        # (v1.07 vs v1.7) fall back to the name so the winner doesn't depend on listing order
+        key = (tuple(int(x) for x in m.group(1).split('.')), p.name)
+        # Only stat entries that would become the new maximum
+        if key > best_key and p.is_dir():
+            best, best_key = p, key
+    return best.name if best is not None else None
 
 
 def _request_with_fallback(client: AutoTQClient, method: str, path: str, **kwargs):
@@ -147,27 +260,78 @@ def api_put(client: AutoTQClient, path: str, **kwargs):
     return _request_with_fallback(client, 'PUT', path, **kwargs)
 
 
+_PROG_SINGLETON = None  # type: ignore
+_PROG_LOCK = threading.Lock()
+
+
+def _get_prog() -> AutoTQFirmwareProgrammer:
+    """Return a shared programmer instance (esptool/firmware discovery runs once)."""
+    global _PROG_SINGLETON
+    with _PROG_LOCK:
+        if _PROG_SINGLETON is None:
+            with suppress_output():
+                _PROG_SINGLETON = AutoTQFirmwareProgrammer()
+        return _PROG_SINGLETON
+
+
 def _list_esp_ports() -> List[str]:
     """Return list of ports currently detected as ESP/AutoTQ ('🎯' tagged)."""
-    with suppress_output():
-        prog = AutoTQFirmwareProgrammer()
-        ports = prog.list_available_ports()
-    return [p for p, desc in ports if '🎯' in desc]
+    if list_ports is None:
+        with suppress_output():
+            ports = _get_prog().list_available_ports(quiet=True)
+        return [p for p, _, is_esp32 in ports if is_esp32]
+    # Same criteria as AutoTQFirmwareProgrammer.list_available_ports, without the discovery cost
+    return [
+        p.device for p in list_ports.comports()
+        if (p.vid, p.pid) in ESP32_USB_IDS or 'esp32' in (p.description or '').lower()
+    ]
+
+
+def _open_tty_monitor():
+    """Return a started udev monitor for tty add/remove events, or None if unavailable."""
+    if pyudev is None:
+        return None
+    try:
+        monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+        monitor.filter_by('tty')
+        monitor.start()
+        return monitor
+    except Exception:
+        return None
+
+
+def _wait_for_port_change(monitor, deadline: float) -> None:
+    """Block until a hotplug event arrives (or 250 ms poll interval without a monitor)."""
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        return
+    if monitor is None:
+        time.sleep(min(0.25, remaining))
+        return
+    try:
+        if monitor.poll(timeout=remaining) is not None:
+            # Drain the burst of events that accompanies one (un)plug
+            while monitor.poll(timeout=0) is not None:
+                pass
+    except Exception:
+        time.sleep(min(0.25, remaining))
 
 
 def _wait_for_usb_reenumeration(max_wait_disconnect_s: float = 15.0, max_wait_reconnect_s: float = 30.0) -> None:
     """Wait for user to unplug then re-plug AutoTQ USB. Auto-advance on detection or timeout."""
     print("Please unplug the AutoTQ USB device (if connected), wait ~1s, then re-plug it. Auto-detecting re-enumeration...")
+    # Subscribe before the first scan so no event between scan and wait is lost
+    monitor = _open_tty_monitor()
     start_ports = set(_list_esp_ports())
     # Phase 1: wait for disconnect (if any were present)
     deadline = time.time() + max_wait_disconnect_s
     disconnected = False if start_ports else True
     while time.time() < deadline and not disconnected:
+        _wait_for_port_change(monitor, deadline)
         ports_now = set(_list_esp_ports())
         if not ports_now:
             disconnected = True
             break
-        time.sleep(0.25)
     # Phase 2: wait for reconnect (presence of any ESP port)
     deadline2 = time.time() + max_wait_reconnect_s
     while time.time() < deadline2:
@@ -177,7 +341,7 @@ def _wait_for_usb_reenumeration(max_wait_disconnect_s: float = 15.0, max_wait_re
             time.sleep(2.0)
             print(f"Detected device on: {', '.join(sorted(list(ports_now)))}")
             return
-        time.sleep(0.25)
+        _wait_for_port_change(monitor, deadline2)
     print("Proceeding without re-enumeration confirmation (timeout reached).")
 def _open_serial_safely(port: str, params: Dict[str, Any]):
     """Open serial port with DTR/RTS deasserted to avoid ESP32 auto-reset."""
@@ -203,22 +367,79 @@ def _open_serial_safely(port: str, params: Dict[str, Any]):
             s.setRTS(False)
         except Exception:
             pass
+        # Linux USB-serial drivers batch input on a ~16 ms latency timer; ask for immediate
+        # delivery (ASYNC_LOW_LATENCY). Only the POSIX backend has this; ignore if refused.
+        try:
+            if hasattr(s, 'set_low_latency_mode'):
+                s.set_low_latency_mode(True)
+        except Exception:
+            pass
         if VERBOSE_SERIAL:
-            print(f"[SER] Opened {port} baud={s.baudrate} DTR={getattr(s, 'dtr', '?')} RTS={getattr(s, 'rts', '?')}")
+            _print(f"[SER] Opened {port} baud={s.baudrate} DTR={getattr(s, 'dtr', '?')} RTS={getattr(s, 'rts', '?')}")
         return s
     except Exception:
         return None
 
 
+def _iter_serial_lines(s, deadline: float):
+    """Yield complete, stripped, non-empty lines (str) received on s until deadline.
+
+    Blocks in the driver via read_until() instead of sleep-polling in_waiting, so a
+    reply is handled as soon as its newline arrives.
+    """
+    pending = b""
+    while time.time() < deadline:
+        s.timeout = min(max(0.0, deadline - time.time()), 0.25)
+        chunk = s.read_until(b'\n')
+        if not chunk:
+            continue
+        if not chunk.endswith(b'\n'):
+            # Timed out mid-line; keep the fragment for the next read
+            pending += chunk
+            continue
+        line = (pending + chunk).decode('utf-8', errors='ignore').strip()
+        pending = b""
+        if not line:
+            continue
+        if VERBOSE_SERIAL:
+            _print(f"[RX] {line}")
+        yield line
+
+
+def _wait_serial_readable(s, timeout: float) -> None:
+    """Sleep up to timeout, returning early once s has input (POSIX select on the tty fd).
+
+    Windows serial handles are not selectable, so there this is a plain sleep.
+    """
+    if sys.platform != 'win32':
+        try:
+            select.select([s.fileno()], [], [], timeout)
+            return
+        except Exception:
+            pass
+    time.sleep(timeout)
+
+
+def _set_windows_timer_resolution(enable: bool) -> None:
+    """Request (or release) 1 ms timer resolution on Windows; default ~15.6 ms ticks stretch short sleeps."""
+    if sys.platform != 'win32':
+        return
+    try:
+        import ctypes
+        winmm = ctypes.windll.winmm
+        (winmm.timeBeginPeriod if enable else winmm.timeEndPeriod)(1)
+    except Exception:
+        pass
+
+
 def _extract_mac_from_json(obj: Any) -> Optional[str]:
-    import re
     if isinstance(obj, dict):
         for k in [
             'mac', 'mac_address', 'macAddress', 'ble_mac', 'bleMac',
             'wifi_mac', 'wifiMac', 'bt_mac', 'btMac']:
             v = obj.get(k)
             if isinstance(v, str):
-                m = re.search(r"([0-9A-Fa-f]{2}(:[0-9A-Fa-f]{2}){5})", v)
+                m = _MAC_VALUE_RE.search(v)
                 if m:
                     return m.group(1)
         for v in obj.values():
@@ -233,62 +454,42 @@ def _extract_mac_from_json(obj: Any) -> Optional[str]:
     return None
 
 
-def read_mac_via_status(port: str, timeout_s: float = 2.5) -> Optional[str]:
-    if serial is None:
-        return None
-    params = AutoTQDeviceProgrammer.SERIAL_PARAMS
-    s = _open_serial_safely(port, params)
-    if s is None:
+def _read_mac_in_process(port: str) -> Optional[str]:
+    """Read the base MAC through the esptool library on this process's own port handle.
+
+    Raises on esptool API mismatches so read_mac can fall back to the subprocess path;
+    connection failures (FatalError) return None like a failed esptool run.
+    """
+    try:
+        esp = _esptool_detect_chip(port=port, baud=115200)
+    except _EsptoolFatalError:
         return None
     try:
-        time.sleep(0.2)
-        try:
-            s.reset_input_buffer()
-            s.reset_output_buffer()
-        except Exception:
-            pass
+        mac = esp.read_mac()
+        return ":".join(f"{b:02x}" for b in mac) if mac else None
+    finally:
+        # Leave the download ROM like the esptool CLI does on exit
         try:
-            payload = (json.dumps({"command": "get_status"}) + "\n").encode("utf-8")
-            if VERBOSE_SERIAL:
-                print(f"[TX] {payload.decode('utf-8', errors='ignore').strip()}")
-            s.write(payload)
+            esp.hard_reset()
+            reset_ok = True
         except Exception:
-            pass
-        deadline = time.time() + timeout_s
-        buffer = ""
-        while time.time() < deadline:
-            if s.in_waiting > 0:
-                data = s.read(s.in_waiting).decode('utf-8', errors='ignore')
-                if VERBOSE_SERIAL and data:
-                    for line in data.splitlines():
-                        if line.strip():
-                            print(f"[RX] {line.strip()}")
-                buffer += data
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        obj = json.loads(line)
-                        mac = _extract_mac_from_json(obj)
-                        if mac:
-                            return mac
-                    except Exception:
-                        # ignore non-JSON
-                        continue
-            time.sleep(0.05)
-        return None
-    finally:
+            reset_ok = False
         try:
-            s.close()
+            esp._port.close()
         except Exception:
             pass
+        if not reset_ok:
+            _reset_esp32_devices([port])
 
 
 def read_mac(port: str) -> Optional[str]:
+    if _esptool_detect_chip is not None:
+        try:
+            return _read_mac_in_process(port)
+        except Exception:
+            pass
     try:
-        prog = AutoTQFirmwareProgrammer()
+        prog = _get_prog()
         if not prog.esptool_path:
             return None
         import subprocess, sys, os
@@ -299,168 +500,167 @@ def read_mac(port: str) -> Optional[str]:
             cmd = [sys.executable, prog.esptool_path, "--port", port, "--baud", "115200", "read_mac"]
         else:
             cmd = [prog.esptool_path, "--port", port, "--baud", "115200", "read_mac"]
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=20)
-        out = (result.stdout or "") + "\n" + (result.stderr or "")
-        for line in out.splitlines():
+        # Stream output and stop esptool as soon as the MAC line appears
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   text=True, bufsize=1)
+        output_queue: Queue = Queue()
+
+        def reader_thread_func():
+            try:
+                assert process.stdout is not None
+                for line in process.stdout:
+                    output_queue.put(line)
+            except Exception:
+                pass
+            output_queue.put(None)
+
+        threading.Thread(target=reader_thread_func, daemon=True).start()
+        deadline = time.time() + 20
+        mac = None
+        while mac is None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            try:
+                line = output_queue.get(timeout=remaining)
+            except Empty:
+                break
+            if line is None:
+                break
             line = line.strip()
             if line.lower().startswith("mac:"):
-                return line.split(":", 1)[1].strip()
-        import re
-        m = re.search(r"([0-9A-Fa-f]{2}(:[0-9A-Fa-f]{2}){5})", out)
-        if m:
-            return m.group(1)
+                mac = line.split(":", 1)[1].strip()
+            else:
+                m = _MAC_VALUE_RE.search(line)
+                if m:
+                    mac = m.group(1)
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                process.kill()
+            # esptool was stopped before its own hard reset; leave the download ROM
+            _reset_esp32_devices([port])
+        return mac
     except Exception:
         return None
-    return None
-
 
-def _extract_fw_from_json(obj: Any) -> Optional[str]:
-    import re
-    if isinstance(obj, dict):
-        # Look for common keys first
-        for k in ["version", "fw_version", "firmware_version", "firmware", "fw"]:
-            v = obj.get(k)
-            if isinstance(v, str) and v.strip():
-                return v.strip()
-        # Recurse
-        for v in obj.values():
-            found = _extract_fw_from_json(v)
-            if found:
-                return found
-    elif isinstance(obj, list):
-        for item in obj:
-            found = _extract_fw_from_json(item)
-            if found:
-                return found
-    # Pattern search anywhere
-    s = None
-    try:
-        s = json.dumps(obj)
-    except Exception:
-        s = str(obj)
-    if s:
-        m = re.search(r"v?\d+\.\d+(?:\.\d+)?", s)
-        if m:
-            return m.group(0)
-    return None
 
+# Candidate keys in priority order
+_FW_KEYS = ("version", "fw_version", "firmware_version", "firmware", "fw")
+_HW_KEYS = (
+    "hardware_version",
+    "hw_version",
+    "hardware",
+    "hw",
+    "board_revision",
+    "board_rev",
+    "board",
+    "revision",
+    "rev",
+)
 
-def read_fw_version_via_serial(port: str, timeout_s: float = 3.0) -> Optional[str]:
-    if serial is None:
-        return None
-    params = AutoTQDeviceProgrammer.SERIAL_PARAMS
-    try:
-        ser = _open_serial_safely(port, params)
-        if ser is None:
-            return None
-        time.sleep(1.5)
-        # Ask device status first (preferred), then version fallback
-        try:
-            ser.write((json.dumps({"command": "get_status"}) + "\n").encode("utf-8"))
-            time.sleep(0.1)
-            ser.write((json.dumps({"command": "version"}) + "\n").encode("utf-8"))
-        except Exception:
-            pass
-        deadline = time.time() + timeout_s
-        buffer = ""
-        while time.time() < deadline:
-            if ser.in_waiting > 0:
-                data = ser.read(ser.in_waiting).decode('utf-8', errors='ignore')
-                buffer += data
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    line = line.strip()
-                    if not line:
-                        continue
-                    # Expect JSON; try to extract firmware version string
-                    try:
-                        obj = json.loads(line)
-                        val = _extract_fw_from_json(obj)
-                        if isinstance(val, str) and val:
-                            ser.close()
-                            return val
-                    except Exception:
-                        continue
-            time.sleep(0.05)
-        ser.close()
-    except Exception:
-        return None
-    return None
 
+def _extract_fw_hw_from_json(obj: Any, fw: Optional[str] = None, hw: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+    """Find (firmware, hardware) version strings in one walk of the reply tree.
 
-def _extract_hw_from_json(obj: Any) -> Optional[str]:
+    Values already known are passed in and left alone; the walk stops once both are set.
+    """
     if isinstance(obj, dict):
-        for k in [
-            "hardware_version",
-            "hw_version",
-            "hardware",
-            "hw",
-            "board_revision",
-            "board_rev",
-            "board",
-            "revision",
-            "rev",
-        ]:
-            v = obj.get(k)
-            if isinstance(v, (str, int, float)):
-                return str(v)
-        for v in obj.values():
-            found = _extract_hw_from_json(v)
-            if found:
-                return found
+        if fw is None:
+            for k in _FW_KEYS:
+                v = obj.get(k)
+                if isinstance(v, str) and v.strip():
+                    fw = v.strip()
+                    break
+        if hw is None:
+            for k in _HW_KEYS:
+                v = obj.get(k)
+                if isinstance(v, (str, int, float)):
+                    hw = str(v)
+                    break
+        children = obj.values()
     elif isinstance(obj, list):
-        for item in obj:
-            found = _extract_hw_from_json(item)
-            if found:
-                return found
-    return None
+        children = obj
+    else:
+        return fw, hw
+    for v in children:
+        if fw is not None and hw is not None:
+            break
+        fw, hw = _extract_fw_hw_from_json(v, fw, hw)
+    return fw, hw
+
 
+def read_identity(port: str, timeout_s: float = 3.0) -> Dict[str, Optional[str]]:
+    """Return {mac, firmware_version, hardware_version} from one serial session.
 
-def read_device_info_via_serial(port: str, timeout_s: float = 3.0) -> Dict[str, Optional[str]]:
-    """Return {firmware_version, hardware_version} parsed from device JSON responses."""
-    info: Dict[str, Optional[str]] = {"firmware_version": None, "hardware_version": None}
+    Sends get_status + version once and extracts all three fields from the replies.
+    """
+    info: Dict[str, Optional[str]] = {"mac": None, "firmware_version": None, "hardware_version": None}
     if serial is None:
         return info
-    params = AutoTQDeviceProgrammer.SERIAL_PARAMS
+    params = _SERIAL_PARAMS
+    s = _open_serial_safely(port, params)
+    if s is None:
+        return info
     try:
-        ser = _open_serial_safely(port, params)
-        if ser is None:
-            return info
+        # Settle before talking: if opening the port still reset the ESP32 (some USB-serial
+        # bridges pulse DTR/RTS on open), the firmware needs this long to boot
         time.sleep(1.5)
         try:
-            ser.write((json.dumps({"command": "get_status"}) + "\n").encode("utf-8"))
-            time.sleep(0.1)
-            ser.write((json.dumps({"command": "version"}) + "\n").encode("utf-8"))
+            s.reset_input_buffer()
+            s.reset_output_buffer()
         except Exception:
             pass
-        deadline = time.time() + timeout_s
-        buffer = ""
-        while time.time() < deadline and (info["firmware_version"] is None or info["hardware_version"] is None):
-            if ser.in_waiting > 0:
-                data = ser.read(ser.in_waiting).decode('utf-8', errors='ignore')
-                buffer += data
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        obj = json.loads(line)
-                        if info["firmware_version"] is None:
-                            fw = _extract_fw_from_json(obj)
-                            if fw:
-                                info["firmware_version"] = fw
-                        if info["hardware_version"] is None:
-                            hw = _extract_hw_from_json(obj)
-                            if hw:
-                                info["hardware_version"] = hw
-                    except Exception:
-                        continue
-            time.sleep(0.05)
-        ser.close()
+        try:
+            if VERBOSE_SERIAL:
+                _print(f"[TX] {_CMD_STATUS.decode('utf-8').strip()}")
+                _print(f"[TX] {_CMD_VERSION.decode('utf-8').strip()}")
+            s.write(_CMD_STATUS + _CMD_VERSION)
+        except Exception:
+            pass
+        for line in _iter_serial_lines(s, time.time() + timeout_s):
+            try:
+                obj = _json_loads(line)
+            except Exception:
+                # ignore non-JSON
+                continue
+            if info["mac"] is None:
+                info["mac"] = _extract_mac_from_json(obj)
+            fw, hw = _extract_fw_hw_from_json(obj, info["firmware_version"], info["hardware_version"])
+            info["firmware_version"] = fw
+            info["hardware_version"] = hw
+            if info["mac"] and fw is not None and hw is not None:
+                break
+        return info
     except Exception:
         return info
-    return info
+    finally:
+        try:
+            s.close()
+        except Exception:
+            pass
+
+
+def _ask(prompt: str, default: str = '') -> str:
+    """input() that returns default under --yes, on EOF, or after --prompt-timeout seconds."""
+    if ASSUME_YES:
+        print(f"{prompt}{default} (auto)")
+        return default
+    try:
+        if PROMPT_TIMEOUT_S > 0 and sys.platform != 'win32' and sys.stdin.isatty():
+            print(prompt, end='', flush=True)
+            ready, _, _ = select.select([sys.stdin], [], [], PROMPT_TIMEOUT_S)
+            if not ready:
+                print(f"{default} (timeout)")
+                return default
+            answer = sys.stdin.readline()
+        else:
+            answer = input(prompt)
+    except Exception:
+        return default
+    return answer.strip() or default
 
 
 def main() -> int:
@@ -475,8 +675,13 @@ def main() -> int:
     parser.add_argument("--ppk-measure-only", action="store_true", help="Do not enable PPK source; use PPK as ammeter only")
     parser.add_argument("--thermal-cycles", type=int, default=0, help="If >0, run thermal test plan for this many cycles (use with --stage thermal)")
     parser.add_argument("--thermal-repeats", type=int, default=9, help="Repeats per temperature stage in thermal plan (default 9)")
+    parser.add_argument("-y", "--yes", action="store_true", help="Do not prompt; use defaults (stage factory, no plots)")
+    parser.add_argument("--prompt-timeout", type=float, default=0.0, help="Seconds before an unanswered prompt takes its default (0 = wait)")
     args = parser.parse_args()
 
+    global ASSUME_YES, PROMPT_TIMEOUT_S
+    ASSUME_YES = bool(args.yes)
+    PROMPT_TIMEOUT_S = max(0.0, float(args.prompt_timeout or 0.0))
     global VERBOSE_SERIAL
     VERBOSE_SERIAL = bool(getattr(args, 'verbose_serial', False))
     global PPK_MEASURE_ONLY
@@ -496,10 +701,7 @@ def main() -> int:
     firmware_dir = Path("firmware")
     latest = find_latest_version(firmware_dir)
 
-    with suppress_output():
-        prog = AutoTQFirmwareProgrammer()
-        ports = prog.list_available_ports()
-    esp_ports = [p for p, desc in ports if '🎯' in desc]
+    esp_ports = _list_esp_ports()
 
     if not esp_ports:
         print("No AutoTQ devices detected.")
@@ -512,12 +714,22 @@ def main() -> int:
             client.set_api_key(args.api_key, prompt_if_missing=False)
         except Exception:
             pass
+    # One run, one client: verify the key (or prompt) once, not once per device. The lock
+    # keeps concurrent probe workers from prompting at the same time.
+    auth_lock = threading.Lock()
+    authenticated = False
+
+    def ensure_authenticated() -> None:
+        nonlocal authenticated
+        with auth_lock:
+            if not authenticated:
+                authenticated = bool(client.is_authenticated() or client.login())
 
     # Determine stage label and whether to create PCBs
     stage_label = args.stage
     if not stage_label:
         print("Select stage for this run: 1) factory  2) post_thermal  3) thermal")
-        choice = (input("Enter 1, 2 or 3 [1]: ").strip() or '1')
+        choice = _ask("Enter 1, 2 or 3 [1]: ", '1')
         if choice == '1':
             stage_label = 'factory'
         elif choice == '2':
@@ -527,18 +739,13 @@ def main() -> int:
     allow_create = (stage_label == 'factory')
 
     # Offer visualization before testing starts
-    try:
-        viz_choice = input("View existing data before testing? (v=this device, a=all, Enter=skip): ").strip().lower()
-    except Exception:
-        viz_choice = ''
+    viz_choice = _ask("View existing data before testing? (v=this device, a=all, Enter=skip): ").lower()
     if viz_choice in ('v', 'a'):
-        if not client.is_authenticated():
-            client.login()
+        ensure_authenticated()
         if viz_choice == 'a':
             visualize_all_tests(client)
         else:
             # Pick a connected device to visualize
-            esp_ports = [p for p, desc in ports if '🎯' in desc]
             target_port = None
             if len(esp_ports) == 1:
                 target_port = esp_ports[0]
@@ -547,7 +754,7 @@ def main() -> int:
                 for i, p in enumerate(esp_ports, 1):
                     print(f"  {i}. {p}")
                 try:
-                    sel = int(input("Select number: ").strip())
+                    sel = int(_ask("Select number: ", '1'))
                     if 1 <= sel <= len(esp_ports):
                         target_port = esp_ports[sel-1]
                 except Exception:
@@ -563,36 +770,38 @@ def main() -> int:
             else:
                 print("No connected devices to visualize.")
 
-    for port in esp_ports:
-        # Prefer non-esptool MAC read to avoid bootloader reset
-        mac = read_mac_via_status(port) or read_mac(port) or "?"
-        # Pull firmware + hardware from device JSON
-        dinfo = read_device_info_via_serial(port)
-        fw = dinfo.get("firmware_version") or read_fw_version_via_serial(port) or "?"
-        hw = dinfo.get("hardware_version") or None
-        if latest and isinstance(fw, str) and fw == latest:
-            print(f"[OK]  {port:<8} MAC={mac:<17} FW={fw} (up-to-date)")
-        elif latest and isinstance(fw, str) and fw != "?":
-            print(f"[OUT] {port:<8} MAC={mac:<17} FW={fw} (latest={latest})")
-        else:
-            print(f"[INFO] {port:<8} MAC={mac:<17} FW={fw}")
+    # Test uploads run here so the next measure_sequence starts without waiting on HTTP
+    upload_pool = ThreadPoolExecutor(max_workers=4)
+
+    def probe_port(port: str) -> Dict[str, Any]:
+        """Identify, measure and upload one device; safe to run concurrently per port."""
+        # MAC, firmware and hardware from one serial session; esptool only if no MAC came back
+        ident = read_identity(port)
+        mac = ident.get("mac") or read_mac(port) or "?"
+        fw = ident.get("firmware_version") or "?"
+        hw = ident.get("hardware_version") or None
+        with _PRINT_LOCK:
+            if latest and isinstance(fw, str) and fw == latest:
+                print(f"[OK]  {port:<8} MAC={mac:<17} FW={fw} (up-to-date)")
+            elif latest and isinstance(fw, str) and fw != "?":
+                print(f"[OUT] {port:<8} MAC={mac:<17} FW={fw} (latest={latest})")
+            else:
+                print(f"[INFO] {port:<8} MAC={mac:<17} FW={fw}")
 
         pcb_id: Optional[int] = None
         # Ensure authentication if we are going to call the API
         if mac != "?" and fw != "?":
-            if not client.is_authenticated():
-                client.login()
+            ensure_authenticated()
             pcb = ensure_pcb_stage(client, mac, fw, hw, stage_label=stage_label, allow_create=allow_create)
             if pcb:
                 pcb_id = pcb.get('id')
 
         # Determine repeats based on stage
         repeats = 3
-        cycle_index = None
-        temp_label = None
         if stage_label == 'thermal':
             repeats = max(1, int(getattr(args, 'thermal_repeats', 9)))
         results = []
+        uploads = []
         for run_idx in range(1, repeats + 1):
             measure = _run_measure_on_port(port)
             if measure:
@@ -602,20 +811,37 @@ def main() -> int:
                     measure.setdefault('result_summary', {})
                     measure['result_summary']['thermal_run_index'] = run_idx
                 results.append(measure)
-                _print_measure_summary(port, measure)
+                with _PRINT_LOCK:
+                    _print_measure_summary(port, measure)
                 if pcb_id is not None:
-                    post_measure_tests(client, pcb_id, measure, stage_label=stage_label, run_index=run_idx)
+                    uploads.append(upload_pool.submit(post_measure_tests, client, pcb_id, measure,
+                                                      stage_label=stage_label, run_index=run_idx))
             else:
-                print(f"[MEASURE-ERR] {port:<8} Unable to obtain measure_sequence result (run {run_idx})")
+                with _PRINT_LOCK:
+                    print(f"[MEASURE-ERR] {port:<8} Unable to obtain measure_sequence result (run {run_idx})")
         # Deep sleep measurement removed per request
+        for u in uploads:
+            u.result()
+        return {"port": port, "mac": mac, "fw": fw, "hw": hw, "measures": results, "pcb_id": pcb_id}
+
+    # Each port is an independent serial fd, so probes overlap their waits. The PPK feeds a
+    # single sample stream into _run_measure_on_port's windows, so keep one device at a time
+    # while it is active.
+    workers = 1 if GLOBAL_PPK is not None else len(esp_ports)
+    probed: List[Dict[str, Any]] = []
+    with upload_pool, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(probe_port, p) for p in esp_ports]
+        for future in as_completed(futures):
+            probed.append(future.result())
+
+    # Summaries and the interactive plot prompt run after all probes finish
+    for res in probed:
+        pcb_id = res["pcb_id"]
         if pcb_id is not None:
             show_pcb_summary(client, pcb_id)
             # Optional visualization
-            try:
-                choice = input("View plot (v to visualize, Enter to skip): ").strip().lower()
-            except Exception:
-                choice = ""
-            if choice == 'v' and pcb_id is not None:
+            choice = _ask(f"View plot for {res['port']} (v to visualize, Enter to skip): ").lower()
+            if choice == 'v':
                 visualize_tests(client, pcb_id)
 
     return 0
@@ -647,7 +873,7 @@ def ensure_pcb_stage(client: AutoTQClient, mac: str, fw: Optional[str], hw: Opti
             # Let's attach a temporary flag to the returned dict for the caller
             data['_is_new'] = (r.status_code == 201)
             
-            print(f"[PCB] upserted id={data.get('id')} stage={data.get('current_stage_label')}")
+            _print(f"[PCB] upserted id={data.get('id')} stage={data.get('current_stage_label')}")
             return data
             
         if r.status_code == 403:
@@ -655,7 +881,7 @@ def ensure_pcb_stage(client: AutoTQClient, mac: str, fw: Optional[str], hw: Opti
                 detail = r.json().get('detail')
             except Exception:
                 detail = r.text
-            print(f"[PCB-ERR] 403 Forbidden on upsert-by-mac: {detail}")
+            _print(f"[PCB-ERR] 403 Forbidden on upsert-by-mac: {detail}")
             return None
         
         # If 404 and not allow_create, just return None
@@ -697,15 +923,41 @@ def ensure_pcb_stage(client: AutoTQClient, mac: str, fw: Optional[str], hw: Opti
             
         return None
     except Exception as e:
-        print(f"[PCB-ERR] {e}")
+        _print(f"[PCB-ERR] {e}")
         return None
 
 
+# PPK overlay fields copied verbatim from a measure_sequence block into measured_values
+_PPK_FIELDS = ('ppk_voltage_v', 'ppk_current_mA', 'ppk_min_mA', 'ppk_max_mA')
+
+
+def _copy_ppk(src: Dict[str, Any], dst: Dict[str, Any]) -> None:
+    for f in _PPK_FIELDS:
+        v = src.get(f)
+        if v is not None:
+            dst[f] = v
+
+
+def _copy_primary(src: Dict[str, Any], dst: Dict[str, Any], driver_key: Optional[str] = None, driver_dst: Optional[str] = None) -> None:
+    """Copy device voltage, optional driver current and total current (A -> mA)."""
+    v = src.get('voltage_v')
+    if v is not None:
+        dst['voltage_v'] = v
+    if driver_key:
+        d = src.get(driver_key)
+        if d is not None:
+            dst[driver_dst or driver_key] = d
+    i = src.get('current_a')
+    if i is not None:
+        dst['current_mA'] = i * 1000
+
+
 def post_measure_tests(client: AutoTQClient, pcb_id: int, data: Dict[str, Any], stage_label: str = 'factory', run_index: int = 1) -> None:
     """Create device-idle, pump, and valve tests from measure_sequence data."""
     idle = data.get('idle', {}) if isinstance(data.get('idle'), dict) else {}
     pump = data.get('pump_on', {}) if isinstance(data.get('pump_on'), dict) else {}
     valve = data.get('valve_on', {}) if isinstance(data.get('valve_on'), dict) else {}
+    bulk: List[Dict[str, Any]] = []
 
     def _post(path: str, measured: Dict[str, Any], rindex: int) -> None:
         body = {
@@ -714,84 +966,51 @@ def post_measure_tests(client: AutoTQClient, pcb_id: int, data: Dict[str, Any],
             'status': 'pass'
         }
         body['result_summary'] = {'type': path, 'run_index': rindex}
+        bulk.append({'path': path, 'body': body})
+
+    def _post_one(item: Dict[str, Any]) -> None:
+        path = item['path']
+        rindex = item['body']['result_summary']['run_index']
         # Ensure non-versioned PCB path
-        r = client.session.post(f"{client.base_url}/pcbs/{pcb_id}/tests/{path}", json=body, timeout=15)
+        try:
+            r = client.session.post(f"{client.base_url}/pcbs/{pcb_id}/tests/{path}", json=item['body'], timeout=15)
+        except Exception as e:
+            _print(f"[TEST-ERR] {path} -> {e}")
+            return
         if r.status_code in (200, 201):
             tid = r.json().get('id')
-            print(f"[TEST] {path} id={tid} run={rindex}")
+            _print(f"[TEST] {path} id={tid} run={rindex}")
         else:
             try:
                 detail = r.json().get('detail')
             except Exception:
                 detail = r.text
-            print(f"[TEST-ERR] {path} -> {r.status_code} {detail}")
-
-    # idle
-    iv = idle.get('voltage_v')
-    ii = idle.get('current_a')
-    measured_idle = {}
-    if iv is not None:
-        measured_idle['voltage_v'] = iv
-    if ii is not None:
-        measured_idle['current_mA'] = ii * 1000
-    # Add PPK overlays if present
-    if idle.get('ppk_voltage_v') is not None:
-        measured_idle['ppk_voltage_v'] = idle.get('ppk_voltage_v')
-    if idle.get('ppk_current_mA') is not None:
-        measured_idle['ppk_current_mA'] = idle.get('ppk_current_mA')
-    if idle.get('ppk_min_mA') is not None:
-        measured_idle['ppk_min_mA'] = idle.get('ppk_min_mA')
-    if idle.get('ppk_max_mA') is not None:
-        measured_idle['ppk_max_mA'] = idle.get('ppk_max_mA')
+            _print(f"[TEST-ERR] {path} -> {r.status_code} {detail}")
+
+    measured_idle: Dict[str, Any] = {}
+    _copy_primary(idle, measured_idle)
+    _copy_ppk(idle, measured_idle)
     if measured_idle:
         _post('device-idle', measured_idle, run_index)
 
-    # pump
-    pv = pump.get('voltage_v')
-    pi = pump.get('pump_driver_mA')
-    measured_pump = {}
-    if pv is not None:
-        measured_pump['voltage_v'] = pv
-    if pi is not None:
-        measured_pump['pump_current_mA'] = pi
-    # Also include device total current during pump if reported
-    if pump.get('current_a') is not None:
-        measured_pump['current_mA'] = pump.get('current_a') * 1000
-    # PPK overlays
-    if pump.get('ppk_voltage_v') is not None:
-        measured_pump['ppk_voltage_v'] = pump.get('ppk_voltage_v')
-    if pump.get('ppk_current_mA') is not None:
-        measured_pump['ppk_current_mA'] = pump.get('ppk_current_mA')
-    if pump.get('ppk_min_mA') is not None:
-        measured_pump['ppk_min_mA'] = pump.get('ppk_min_mA')
-    if pump.get('ppk_max_mA') is not None:
-        measured_pump['ppk_max_mA'] = pump.get('ppk_max_mA')
+    measured_pump: Dict[str, Any] = {}
+    _copy_primary(pump, measured_pump, 'pump_driver_mA', 'pump_current_mA')
+    _copy_ppk(pump, measured_pump)
     if measured_pump:
         _post('pump', measured_pump, run_index)
 
-    # valve
-    vv = valve.get('voltage_v')
-    vi = valve.get('valve_driver_mA')
-    measured_valve = {}
-    if vv is not None:
-        measured_valve['voltage_v'] = vv
-    if vi is not None:
-        measured_valve['valve_current_mA'] = vi
-    # Also include device total current during valve if reported
-    if valve.get('current_a') is not None:
-        measured_valve['current_mA'] = valve.get('current_a') * 1000
-    # PPK overlays
-    if valve.get('ppk_voltage_v') is not None:
-        measured_valve['ppk_voltage_v'] = valve.get('ppk_voltage_v')
-    if valve.get('ppk_current_mA') is not None:
-        measured_valve['ppk_current_mA'] = valve.get('ppk_current_mA')
-    if valve.get('ppk_min_mA') is not None:
-        measured_valve['ppk_min_mA'] = valve.get('ppk_min_mA')
-    if valve.get('ppk_max_mA') is not None:
-        measured_valve['ppk_max_mA'] = valve.get('ppk_max_mA')
+    measured_valve: Dict[str, Any] = {}
+    _copy_primary(valve, measured_valve, 'valve_driver_mA', 'valve_current_mA')
+    _copy_ppk(valve, measured_valve)
     if measured_valve:
         _post('valve', measured_valve, run_index)
 
+    if not bulk:
+        return
+    # Independent per-type POSTs; issue them concurrently over the shared session
+    with ThreadPoolExecutor(max_workers=len(bulk)) as pool:
+        list(pool.map(_post_one, bulk))
+
 
 def show_pcb_summary(client: AutoTQClient, pcb_id: int) -> None:
     try:
@@ -801,7 +1020,7 @@ def show_pcb_summary(client: AutoTQClient, pcb_id: int) -> None:
             print(f"[PCB] id={pcb.get('id')} mac={pcb.get('mac_address')} stage={pcb.get('current_stage_label')} hw={pcb.get('hardware_version')} fw={pcb.get('firmware_version')}")
         rt = api_get(client, f"/pcbs/{pcb_id}/tests", params={"limit": 20}, timeout=10)
         if rt.status_code == 200:
-            payload = rt.json()
+            payload = _json_loads(rt.content)
             items = payload.get('items') if isinstance(payload, dict) else None
             if isinstance(items, list) and items:
                 print("[TESTS]")
@@ -830,37 +1049,78 @@ def resolve_pcb_id_by_mac(client: AutoTQClient, mac: str) -> Optional[int]:
     return None
 
 
+# Test-type aliases as stored by different uploaders -> plot series key
+_TYPE_MAP = {'device_idle': 'device-idle', 'device-idle': 'device-idle', 'pump': 'pump', 'valve': 'valve'}
+_STAGE_COLORS = {'factory': 'tab:blue', 'post_thermal': 'tab:orange', 'unknown': 'tab:gray'}
+# Colormap indices for the all-units scatter (anything else -> 2, gray)
+_STAGE_CODES = {'factory': 0, 'post_thermal': 1}
+
+
+def _normalize_test_type(ttype: Any) -> str:
+    hit = _TYPE_MAP.get(ttype) if isinstance(ttype, str) else None
+    if hit is not None:
+        return hit
+    s = str(ttype)
+    return _TYPE_MAP.get(s.replace('_', '-'), s)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_ts(ts: str) -> Optional[datetime]:
+    """Parse an API ISO-8601 timestamp (trailing 'Z' allowed) as aware UTC; None if malformed.
+
+    Offset-less server times are taken as UTC, so parsed values always compare and sort
+    (mixing naive and aware datetimes raises TypeError).
+    """
+    # Shortest ISO form is YYYY-MM-DD; skip the parser (and its exception) for anything shorter
+    if len(ts) < 10:
+        return None
+    if ts[-1:] == 'Z':
+        ts = ts[:-1] + '+00:00'
+    try:
+        dt = datetime.fromisoformat(ts)
+    except ValueError:
+        return None
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt.astimezone(timezone.utc)
+
+
+# Both views draw into one named window: reopening a view while it is still up (non-blocking
+# backends) clears and reuses the existing canvas instead of building a new one
+_VIZ_FIG_NUM = 'AutoTQ tests'
+
+
+def _viz_axes():
+    return plt.subplots(3, 1, figsize=(10, 9), sharex=True, num=_VIZ_FIG_NUM, clear=True)
+
+
 def visualize_tests(client: AutoTQClient, pcb_id: int) -> None:
-    if not HAS_MPL:
+    if _get_plt() is None:
         print("matplotlib not installed. Run: pip install matplotlib")
         return
     r = api_get(client, f"/pcbs/{pcb_id}/tests", params={"limit": 200}, timeout=15)
     if r.status_code != 200:
         print("Failed to fetch tests for visualization")
         return
-    items = r.json().get('items', []) if isinstance(r.json(), dict) else []
+    payload = _json_loads(r.content)
+    items = payload.get('items', []) if isinstance(payload, dict) else []
     # Collect per type
-    import datetime as dt
+    # Parallel columns per test type; PPK points are kept as their own (x, y) columns so the
+    # overlay needs no None filtering at plot time
     series = {
-        'device-idle': {'x': [], 'v': [], 'i': [], 'ppk': [], 'stage': []},
-        'pump': {'x': [], 'v': [], 'i': [], 'ppk': [], 'stage': []},
-        'valve': {'x': [], 'v': [], 'i': [], 'ppk': [], 'stage': []},
+        'device-idle': {'x': [], 'v': [], 'i': [], 'ppk_x': [], 'ppk_y': [], 'stage': []},
+        'pump': {'x': [], 'v': [], 'i': [], 'ppk_x': [], 'ppk_y': [], 'stage': []},
+        'valve': {'x': [], 'v': [], 'i': [], 'ppk_x': [], 'ppk_y': [], 'stage': []},
     }
-    type_map = {'device_idle': 'device-idle', 'device-idle': 'device-idle', 'pump': 'pump', 'valve': 'valve'}
     for t in items:
         if not isinstance(t, dict):
             continue
         rs = t.get('result_summary') or {}
         ttype = rs.get('type') or t.get('type') or 'unknown'
-        ttype = type_map.get(str(ttype).replace('_', '-'), str(ttype))
+        ttype = _normalize_test_type(ttype)
         if ttype not in series:
             continue
         mv = t.get('measured_values') or {}
         ts = t.get('test_timestamp')
-        try:
-            x = dt.datetime.fromisoformat(ts.replace('Z', '+00:00')) if isinstance(ts, str) else None
-        except Exception:
-            x = None
+        x = _parse_ts(ts) if isinstance(ts, str) else None
         v = mv.get('voltage_v')
         if ttype == 'device-idle':
             i = mv.get('current_mA')
@@ -872,14 +1132,23 @@ def visualize_tests(client: AutoTQClient, pcb_id: int) -> None:
             i = mv.get('valve_current_mA')
             ppk = mv.get('ppk_current_mA')
         if x is not None and v is not None and i is not None:
-            series[ttype]['x'].append(x)
-            series[ttype]['v'].append(v)
-            series[ttype]['i'].append(i)
-            series[ttype]['ppk'].append(ppk)
-            series[ttype]['stage'].append(t.get('stage_label') or 'unknown')
+            col = series[ttype]
+            col['x'].append(x)
+            col['v'].append(v)
+            col['i'].append(i)
+            col['stage'].append(t.get('stage_label') or 'unknown')
+            if isinstance(ppk, (int, float)):
+                col['ppk_x'].append(x)
+                col['ppk_y'].append(ppk)
 
     # Plot
-    fig, axes = plt.subplots(3, 1, figsize=(10, 9), sharex=True)
+    fig, axes = _viz_axes()
+    # Legend with stage tags; the proxy artists are identical for every axis
+    from matplotlib.lines import Line2D
+    handles = [Line2D([0], [0], color='tab:green', label='Voltage (V)'),
+               Line2D([0], [0], marker='o', color='w', markerfacecolor='tab:blue', label='factory', markersize=8),
+               Line2D([0], [0], marker='o', color='w', markerfacecolor='tab:orange', label='post_thermal', markersize=8),
+               Line2D([0], [0], marker='x', color='tab:red', label='PPK current', markersize=8)]
     for idx, key in enumerate(['device-idle', 'pump', 'valve']):
         ax = axes[idx]
         data = series[key]
@@ -887,57 +1156,64 @@ def visualize_tests(client: AutoTQClient, pcb_id: int) -> None:
             ax.set_title(f"{key} (no data)")
             continue
         # Color by stage
-        colors = {'factory': 'tab:blue', 'post_thermal': 'tab:orange', 'unknown': 'tab:gray'}
-        c = [colors.get(s, 'tab:gray') for s in data['stage']]
+        c = [_STAGE_COLORS.get(s, 'tab:gray') for s in data['stage']]
         ax.plot(data['x'], data['v'], marker='o', linestyle='-', color='tab:green', label='Voltage (V)')
         ax2 = ax.twinx()
         ax2.scatter(data['x'], data['i'], c=c, label='Device current (mA)')
-        # Overlay PPK if present
-        if any(p is not None for p in data['ppk']):
-            y_ppk = [p if isinstance(p, (int, float)) else None for p in data['ppk']]
-            # Plot PPK points in red X markers, skipping None
-            x_ppk = [data['x'][idx] for idx, val in enumerate(y_ppk) if val is not None]
-            y_ppk2 = [val for val in y_ppk if val is not None]
-            if x_ppk:
-                ax2.scatter(x_ppk, y_ppk2, marker='x', color='tab:red', label='PPK current (mA)')
+        # Overlay PPK if present (red X markers)
+        if data['ppk_x']:
+            ax2.scatter(data['ppk_x'], data['ppk_y'], marker='x', color='tab:red', label='PPK current (mA)')
         ax.set_ylabel('Voltage (V)')
         ax2.set_ylabel('Current (mA)')
         ax.set_title(key)
-        # Legend with stage tags
-        from matplotlib.lines import Line2D
-        handles = [Line2D([0], [0], color='tab:green', label='Voltage (V)'),
-                   Line2D([0], [0], marker='o', color='w', markerfacecolor='tab:blue', label='factory', markersize=8),
-                   Line2D([0], [0], marker='o', color='w', markerfacecolor='tab:orange', label='post_thermal', markersize=8),
-                   Line2D([0], [0], marker='x', color='tab:red', label='PPK current', markersize=8)]
         ax.legend(handles=handles, loc='upper left')
     plt.tight_layout()
     plt.show()
 
 
+_PPK_PORT_TTL_S = 10.0
+_ppk_port_cache: List[Any] = [0.0, None]  # [monotonic time of scan, port]
+
+
 def _find_ppk_comport() -> Optional[str]:
     """Try to find Nordic PPK/PPK2 serial port by VID:PID=1915:C00A or known description.
     Returns a COM port string like 'COM44' or None if not found.
+
+    The result is reused for _PPK_PORT_TTL_S seconds; comports() is a slow WMI/registry
+    query on Windows and PPK setup paths call this back to back.
     """
+    now = time.monotonic()
+    if _ppk_port_cache[1] is not None and now - _ppk_port_cache[0] < _PPK_PORT_TTL_S:
+        return _ppk_port_cache[1]
+    port = _scan_ppk_comport()
+    _ppk_port_cache[0] = now
+    _ppk_port_cache[1] = port
+    return port
+
+
+def _scan_ppk_comport() -> Optional[str]:
     try:
         if list_ports is None:
             return None
-        ports = list(list_ports.comports())
-        # Prefer VID:PID match
-        for p in ports:
+        # One pass; precedence: VID:PID match > nRF/PPK description > COM44
+        desc_match = None
+        com44 = None
+        for p in list_ports.comports():
             try:
                 if getattr(p, 'vid', None) == 0x1915 and getattr(p, 'pid', None) == 0xC00A:
                     return p.device
             except Exception:
                 continue
-        # Fallback: description contains nRF Connect USB CDC ACM
-        for p in ports:
-            desc = (getattr(p, 'description', '') or '').lower()
-            if 'nrf connect usb cdc acm' in desc or 'ppk' in desc:
-                return p.device
-        # If COM44 is present, use it
-        for p in ports:
-            if str(p.device).upper() == 'COM44':
-                return p.device
+            if desc_match is None:
+                desc = (getattr(p, 'description', '') or '').lower()
+                if 'nrf connect usb cdc acm' in desc or 'ppk' in desc:
+                    desc_match = p.device
+            if com44 is None and str(p.device).upper() == 'COM44':
+                com44 = p.device
+        if desc_match is not None:
+            return desc_match
+        if com44 is not None:
+            return com44
     except Exception:
         pass
     # Last resort: try COM44 if on Windows
@@ -949,7 +1225,8 @@ def _auto_setup_ppk(voltage_mv: int = 4200, power_cycle: bool = False) -> bool:
     Returns True if PPK was found and configured, else False.
     """
     global GLOBAL_PPK
-    if PPK2_API is None:
+    ppk_api = _get_ppk2_api()
+    if ppk_api is None:
         return False
     try:
         port = _find_ppk_comport()
@@ -959,7 +1236,7 @@ def _auto_setup_ppk(voltage_mv: int = 4200, power_cycle: bool = False) -> bool:
         if GLOBAL_PPK is not None:
             ppk = GLOBAL_PPK
         else:
-            ppk = PPK2_API(port)
+            ppk = ppk_api(port)
             GLOBAL_PPK = ppk
         try:
             try:
@@ -1037,47 +1314,58 @@ def _auto_setup_ppk(voltage_mv: int = 4200, power_cycle: bool = False) -> bool:
         return False
 
 
+def _reset_one_esp32(port: str) -> None:
+    """Toggle DTR/RTS once on port; errors are reported, not raised."""
+    try:
+        params = _SERIAL_PARAMS
+        ser = serial.Serial(port, **params)
+        try:
+            # Clear buffers before reset
+            try:
+                ser.reset_input_buffer()
+                ser.reset_output_buffer()
+            except Exception:
+                pass
+            time.sleep(0.05)
+            # Typical ESP32 auto-reset: assert RTS (EN low), deassert DTR (GPIO0 high), then release RTS
+            ser.dtr = False
+            ser.rts = True
+            time.sleep(0.05)
+            ser.rts = False
+            time.sleep(0.3)
+            # After reset, give boot ROM time, then clear buffers again
+            try:
+                ser.reset_input_buffer()
+                ser.reset_output_buffer()
+            except Exception:
+                pass
+        finally:
+            try:
+                ser.close()
+            except Exception:
+                pass
+        print(f"[RESET] Toggled DTR/RTS on {port}")
+    except Exception as e:
+        print(f"[RESET-ERR] {port}: {e}")
+
+
 def _reset_esp32_devices(esp_ports: List[str]) -> None:
     """Toggle DTR/RTS to reset ESP32-S3 on each provided port."""
     if serial is None:
         return
-    for port in esp_ports:
-        try:
-            params = AutoTQDeviceProgrammer.SERIAL_PARAMS
-            ser = serial.Serial(port, **params)
-            try:
-                # Clear buffers before reset
-                try:
-                    ser.reset_input_buffer()
-                    ser.reset_output_buffer()
-                except Exception:
-                    pass
-                time.sleep(0.05)
-                # Typical ESP32 auto-reset: assert RTS (EN low), deassert DTR (GPIO0 high), then release RTS
-                ser.dtr = False
-                ser.rts = True
-                time.sleep(0.05)
-                ser.rts = False
-                time.sleep(0.3)
-                # After reset, give boot ROM time, then clear buffers again
-                try:
-                    ser.reset_input_buffer()
-                    ser.reset_output_buffer()
-                except Exception:
-                    pass
-            finally:
-                try:
-                    ser.close()
-                except Exception:
-                    pass
-            print(f"[RESET] Toggled DTR/RTS on {port}")
-        except Exception as e:
-            print(f"[RESET-ERR] {port}: {e}")
+    if len(esp_ports) <= 1:
+        for port in esp_ports:
+            _reset_one_esp32(port)
+        return
+    # ~0.4 s of independent sleeps per port; reset them all at once
+    with ThreadPoolExecutor(max_workers=min(16, len(esp_ports))) as executor:
+        list(executor.map(_reset_one_esp32, esp_ports))
 
 
 def _run_ppk_current_monitor(port: Optional[str] = None) -> None:
     """Initialize PPK, set 4.2V, enable power, and print 1-second average current until Ctrl+C."""
-    if PPK2_API is None:
+    ppk_api = _get_ppk2_api()
+    if ppk_api is None:
         print("ppk2_api not installed. Run: pip install ppk2_api")
         return
     try:
@@ -1086,7 +1374,7 @@ def _run_ppk_current_monitor(port: Optional[str] = None) -> None:
             print("Could not find PPK COM port. Specify manually or check connection.")
             return
         print(f"Initializing PPK on {ppk_port} ...")
-        ppk = PPK2_API(ppk_port)
+        ppk = ppk_api(ppk_port)
         try:
             # Configure as source meter and set voltage
             try:
@@ -1106,6 +1394,9 @@ def _run_ppk_current_monitor(port: Optional[str] = None) -> None:
                     pass
             ppk.start_measuring()
             print("PPK output set to 4.2 V. Logging average current every 1s. Press Ctrl+C to stop.")
+            get_data = ppk.get_data
+            get_samples = ppk.get_samples
+            fsum = math.fsum
             while True:
                 window_start = time.time()
                 total_microamps = 0.0
@@ -1113,11 +1404,12 @@ def _run_ppk_current_monitor(port: Optional[str] = None) -> None:
                 # Accumulate samples for ~1s
                 while (time.time() - window_start) < 1.0:
                     try:
-                        data_chunk = ppk.get_data()
+                        data_chunk = get_data()
                         if data_chunk:
-                            samples, _ = ppk.get_samples(data_chunk)
+                            samples, _ = get_samples(data_chunk)
                             if samples:
-                                total_microamps += float(sum(samples))
+                                # fsum: single C pass, exact partials (no drift over long windows)
+                                total_microamps += fsum(samples)
                                 total_samples += len(samples)
                     except Exception:
                         # Short sleep to avoid tight loop on errors
@@ -1148,8 +1440,49 @@ def _run_ppk_current_monitor(port: Optional[str] = None) -> None:
         print(f"PPK error: {e}")
 
 
+def _fetch_tests(client: AutoTQClient, pcb_id: int, limit: int = 200) -> List[Dict[str, Any]]:
+    """Return the test records for one PCB ([] on any failure)."""
+    try:
+        rt = api_get(client, f"/pcbs/{pcb_id}/tests", params={"limit": limit}, timeout=15)
+        if rt.status_code != 200:
+            return []
+        payload = _json_loads(rt.content)
+    except Exception:
+        return []
+    items = payload.get('items', []) if isinstance(payload, dict) else []
+    return items if isinstance(items, list) else []
+
+
+# Per-axis point budget for the all-units scatter plots
+_MAX_SCATTER_POINTS = 5000
+
+
+def _decimate_extrema(xs: List[Any], ys: List[float], max_points: int) -> List[int]:
+    """Indices of at most ~max_points points: per time bin, the lowest and highest y.
+
+    Points are ordered by x and split into max_points // 2 equal-count bins; keeping each
+    bin's extremes preserves current spikes that stride sampling would skip.
+    """
+    n = len(xs)
+    if n <= max_points:
+        return list(range(n))
+    order = sorted(range(n), key=xs.__getitem__)
+    n_bins = max(1, max_points // 2)
+    keep: List[int] = []
+    for b in range(n_bins):
+        chunk = order[b * n // n_bins:(b + 1) * n // n_bins]
+        if not chunk:
+            continue
+        lo = min(chunk, key=ys.__getitem__)
+        hi = max(chunk, key=ys.__getitem__)
+        keep.append(lo)
+        if hi != lo:
+            keep.append(hi)
+    return keep
+
+
 def visualize_all_tests(client: AutoTQClient) -> None:
-    if not HAS_MPL:
+    if _get_plt() is None:
         print("matplotlib not installed. Run: pip install matplotlib")
         return
     # Fetch many PCBs
@@ -1157,43 +1490,35 @@ def visualize_all_tests(client: AutoTQClient) -> None:
     try:
         r = api_get(client, "/pcbs", params={"limit": 200, "offset": 0}, timeout=20)
         if r.status_code == 200:
-            pcbs = r.json().get('items', [])
+            pcbs = _json_loads(r.content).get('items', [])
     except Exception:
         pass
     if not pcbs:
         print("No PCBs found to visualize.")
         return
     # Aggregate across PCBs
-    import datetime as dt
     series = {
         'device-idle': {'x': [], 'i': [], 'ppk': [], 'stage': []},
         'pump': {'x': [], 'i': [], 'ppk': [], 'stage': []},
         'valve': {'x': [], 'i': [], 'ppk': [], 'stage': []},
     }
-    type_map = {'device_idle': 'device-idle', 'device-idle': 'device-idle', 'pump': 'pump', 'valve': 'valve'}
-    for pcb in pcbs:
-        pid = pcb.get('id')
-        if pid is None:
-            continue
+    ids = [pcb.get('id') for pcb in pcbs if pcb.get('id') is not None]
+    # One request per PCB; overlap the round trips instead of paying them back to back
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        per_pcb_items = list(executor.map(lambda pid: _fetch_tests(client, pid), ids))
+    for items in per_pcb_items:
         try:
-            rt = api_get(client, f"/pcbs/{pid}/tests", params={"limit": 200}, timeout=15)
-            if rt.status_code != 200:
-                continue
-            items = rt.json().get('items', []) if isinstance(rt.json(), dict) else []
             for t in items:
                 if not isinstance(t, dict):
                     continue
                 rs = t.get('result_summary') or {}
                 ttype = rs.get('type') or t.get('type') or 'unknown'
-                ttype = type_map.get(str(ttype).replace('_', '-'), str(ttype))
+                ttype = _normalize_test_type(ttype)
                 if ttype not in series:
                     continue
                 mv = t.get('measured_values') or {}
                 ts = t.get('test_timestamp')
-                try:
-                    x = dt.datetime.fromisoformat(ts.replace('Z', '+00:00')) if isinstance(ts, str) else None
-                except Exception:
-                    x = None
+                x = _parse_ts(ts) if isinstance(ts, str) else None
                 if ttype == 'device-idle':
                     i = mv.get('current_mA')
                     ppk = mv.get('ppk_current_mA')
@@ -1211,19 +1536,27 @@ def visualize_all_tests(client: AutoTQClient) -> None:
         except Exception:
             continue
     # Plot currents over time for each test type
-    fig, axes = plt.subplots(3, 1, figsize=(10, 9), sharex=True)
+    from matplotlib.colors import ListedColormap
+    stage_cmap = ListedColormap(['tab:blue', 'tab:orange', 'tab:gray'])
+    fig, axes = _viz_axes()
     for idx, key in enumerate(['device-idle', 'pump', 'valve']):
         ax = axes[idx]
         data = series[key]
         if not data['x']:
             ax.set_title(f"{key} (no data)")
             continue
-        colors = {'factory': 'tab:blue', 'post_thermal': 'tab:orange', 'unknown': 'tab:gray'}
-        c = [colors.get(s, 'tab:gray') for s in data['stage']]
-        ax.scatter(data['x'], data['i'], c=c, label='Device current (mA)')
-        if any(p is not None for p in data['ppk']):
-            x_ppk = [data['x'][idx] for idx, val in enumerate(data['ppk']) if val is not None]
-            y_ppk = [val for val in data['ppk'] if val is not None]
+        # Keep at most ~_MAX_SCATTER_POINTS per axis (per-bin extremes, so spikes survive)
+        keep = _decimate_extrema(data['x'], data['i'], _MAX_SCATTER_POINTS)
+        xs = [data['x'][k] for k in keep]
+        # Integer stage codes through a 3-entry colormap: one vectorized color lookup instead
+        # of parsing a color string per point
+        codes = [_STAGE_CODES.get(data['stage'][k], 2) for k in keep]
+        ax.scatter(xs, [data['i'][k] for k in keep], c=codes, cmap=stage_cmap, vmin=0, vmax=2, s=9,
+                   label='Device current (mA)')
+        ppk_vals = [data['ppk'][k] for k in keep]
+        if any(p is not None for p in ppk_vals):
+            x_ppk = [xs[idx] for idx, val in enumerate(ppk_vals) if val is not None]
+            y_ppk = [val for val in ppk_vals if val is not None]
             if x_ppk:
                 ax.scatter(x_ppk, y_ppk, marker='x', color='tab:red', label='PPK current (mA)')
         ax.set_ylabel('Current (mA)')
@@ -1232,10 +1565,48 @@ def visualize_all_tests(client: AutoTQClient) -> None:
     plt.show()
 
 
+class _PpkWindow:
+    """Running sum/count/min/max (uA) of the PPK samples inside one measure phase window."""
+    __slots__ = ('sum_ua', 'count', 'min_ua', 'max_ua')
+
+    def __init__(self):
+        self.sum_ua = 0.0
+        self.count = 0
+        self.min_ua: Optional[float] = None
+        self.max_ua: Optional[float] = None
+
+
+def _accumulate_ppk_windows(windows: Dict[str, _PpkWindow], mid_windows: Dict[str, Optional[Tuple[float, float]]],
+                            samples, t0: float, dt_per: float) -> None:
+    """Add PPK samples (sample idx captured at t0 + (idx + 0.5) * dt_per) to the mid-windows they fall in.
+
+    Capture times are evenly spaced, so each window maps to one contiguous index range; the
+    sum/min/max then run over a slice instead of testing every sample against every window.
+    """
+    n = len(samples)
+    for bucket, bounds in mid_windows.items():
+        if not bounds:
+            continue
+        start_w, end_w = bounds
+        lo = max(0, math.ceil((start_w - t0) / dt_per - 0.5))
+        hi = min(n, math.floor((end_w - t0) / dt_per - 0.5) + 1)
+        if lo >= hi:
+            continue
+        chunk = samples[lo:hi]
+        win = windows[bucket]
+        win.sum_ua += float(sum(chunk))
+        win.count += hi - lo
+        # One C-level reduction each per chunk, folded into the running extremes
+        lo_ua = float(min(chunk))
+        hi_ua = float(max(chunk))
+        win.min_ua = lo_ua if win.min_ua is None else min(win.min_ua, lo_ua)
+        win.max_ua = hi_ua if win.max_ua is None else max(win.max_ua, hi_ua)
+
+
 def _run_measure_on_port(port: str, timeout_s: float = 20.0) -> Optional[Dict[str, Any]]:
     if serial is None:
         return None
-    params = AutoTQDeviceProgrammer.SERIAL_PARAMS
+    params = _SERIAL_PARAMS
     try:
         ser = _open_serial_safely(port, params)
         if ser is None:
@@ -1243,6 +1614,8 @@ def _run_measure_on_port(port: str, timeout_s: float = 20.0) -> Optional[Dict[st
         time.sleep(2)
     except Exception:
         return None
+    # Balanced in finally; keeps the 1 ms poll below a 1 ms sleep on Windows
+    _set_windows_timer_resolution(True)
     try:
         # Pre-measurement: clear buffers and small delay to avoid stale data
         try:
@@ -1252,16 +1625,15 @@ def _run_measure_on_port(port: str, timeout_s: float = 20.0) -> Optional[Dict[st
             pass
         time.sleep(0.05)
         # Timings used by device side; also used to window PPK averages
-        settle_ms = 500
-        pump_ms = 3000
-        valve_ms = 2000
-        total_ms = settle_ms + pump_ms + valve_ms
-        cmd = {"command": "measure_sequence", "settle_ms": settle_ms, "pump_ms": pump_ms, "valve_ms": valve_ms}
-        payload = (json.dumps(cmd) + "\n").encode("utf-8")
+        settle_ms = _MEASURE_SETTLE_MS
+        pump_ms = _MEASURE_PUMP_MS
+        valve_ms = _MEASURE_VALVE_MS
+        payload = _CMD_MEASURE_SEQUENCE
         if VERBOSE_SERIAL:
-            print(f"[TX] {payload.decode('utf-8', errors='ignore').strip()}")
+            _print(f"[TX] {payload.decode('utf-8', errors='ignore').strip()}")
         ser.write(payload)
-        start_time = time.time()
+        # Monotonic clock: window math is immune to wall-clock steps (NTP) mid-sequence
+        start_time = time.monotonic()
         deadline = start_time + timeout_s
         # Prepare PPK accumulation windows (middle 50% of each phase) if PPK active
         ppk = GLOBAL_PPK
@@ -1269,11 +1641,7 @@ def _run_measure_on_port(port: str, timeout_s: float = 20.0) -> Optional[Dict[st
         ppk_mid_windows = None  # time windows (start_s, end_s) in absolute time
         last_ppk_fetch_time = None
         if ppk is not None:
-            ppk_windows = {
-                'idle': {'sum_ua': 0.0, 'count': 0, 'v_mv': GLOBAL_PPK_VOLTAGE_MV, 'min_ua': None, 'max_ua': None},
-                'pump_on': {'sum_ua': 0.0, 'count': 0, 'v_mv': GLOBAL_PPK_VOLTAGE_MV, 'min_ua': None, 'max_ua': None},
-                'valve_on': {'sum_ua': 0.0, 'count': 0, 'v_mv': GLOBAL_PPK_VOLTAGE_MV, 'min_ua': None, 'max_ua': None},
-            }
+            ppk_windows = {'idle': _PpkWindow(), 'pump_on': _PpkWindow(), 'valve_on': _PpkWindow()}
             # Compute absolute mid-windows based on device timing model
             settle_s = settle_ms / 1000.0
             pump_window_s = max(0.0, (pump_ms - settle_ms) / 1000.0)
@@ -1292,110 +1660,93 @@ def _run_measure_on_port(port: str, timeout_s: float = 20.0) -> Optional[Dict[st
                 'valve_on': (valve_mid_start, valve_mid_end) if valve_mid_end > valve_mid_start else None,
             }
         # Helper to update PPK windows distributing samples across elapsed time since last read
-        def _ppk_update() -> None:
+        def _ppk_update(now: float) -> None:
             nonlocal last_ppk_fetch_time
             if ppk is None:
                 return
+            # Only the PPK API calls can fail (USB hiccup); an empty read is the common case
             try:
                 data_chunk = ppk.get_data()
                 if not data_chunk:
                     return
                 samples, _ = ppk.get_samples(data_chunk)
-                if not samples:
-                    return
-                now = time.time()
-                # Distribute samples uniformly across interval since previous fetch
-                if last_ppk_fetch_time is None:
-                    last_ppk_fetch_time = now
-                    # Without a previous timestamp, distribute only samples that land within mid-windows
-                    n0 = len(samples)
-                    if ppk_mid_windows is not None and n0 > 0:
-                        # Assume samples spread over a short default span (e.g., 10 ms) to place them near 'now'
-                        dt0 = 0.01
-                        dt_per0 = dt0 / n0
-                        for idx, ua in enumerate(samples):
-                            t_sample = now - dt0 + (idx + 0.5) * dt_per0
-                            for bucket, bounds in (ppk_mid_windows.items() if ppk_mid_windows else []):
-                                if not bounds:
-                                    continue
-                                start_w, end_w = bounds
-                                if start_w <= t_sample <= end_w:
-                                    win = ppk_windows[bucket]
-                                    win['sum_ua'] += float(ua)
-                                    win['count'] += 1
-                                    if win['min_ua'] is None or ua < win['min_ua']:
-                                        win['min_ua'] = float(ua)
-                                    if win['max_ua'] is None or ua > win['max_ua']:
-                                        win['max_ua'] = float(ua)
-                    return
-                dt = max(0.0, now - last_ppk_fetch_time)
-                last_ppk_fetch_time = now
-                n = len(samples)
-                if n == 0 or dt <= 0:
-                    return
-                dt_per = dt / n
-                # Assign each sample to bucket by its estimated capture time
-                for idx, ua in enumerate(samples):
-                    t_sample = now - dt + (idx + 0.5) * dt_per
-                    # Use mid-windows only
-                    if ppk_mid_windows is None:
-                        continue
-                    for bucket, bounds in ppk_mid_windows.items():
-                        if not bounds:
-                            continue
-                        start_w, end_w = bounds
-                        if start_w <= t_sample <= end_w:
-                            win = ppk_windows[bucket]
-                            win['sum_ua'] += float(ua)
-                            win['count'] += 1
-                            if win['min_ua'] is None or ua < win['min_ua']:
-                                win['min_ua'] = float(ua)
-                            if win['max_ua'] is None or ua > win['max_ua']:
-                                win['max_ua'] = float(ua)
             except Exception:
-                pass
-        buffer = ""
-        while time.time() < deadline:
-            if ser.in_waiting > 0:
-                data = ser.read(ser.in_waiting).decode('utf-8', errors='ignore')
-                if VERBOSE_SERIAL and data:
-                    for line in data.splitlines():
-                        if line.strip():
-                            print(f"[RX] {line.strip()}")
-                buffer += data
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
-                    line = line.strip()
-                    if not line:
+                return
+            if not samples or ppk_mid_windows is None:
+                return
+            n = len(samples)
+            # Distribute samples uniformly across interval since previous fetch
+            if last_ppk_fetch_time is None:
+                last_ppk_fetch_time = now
+                # Without a previous timestamp, assume samples spread over a short default span
+                # (e.g., 10 ms) to place them near 'now'; only those inside mid-windows count
+                dt0 = 0.01
+                _accumulate_ppk_windows(ppk_windows, ppk_mid_windows, samples, now - dt0, dt0 / n)
+                return
+            dt = now - last_ppk_fetch_time
+            last_ppk_fetch_time = now
+            if dt <= 0:
+                return
+            # Assign samples to buckets by their estimated capture time (mid-windows only)
+            _accumulate_ppk_windows(ppk_windows, ppk_mid_windows, samples, now - dt, dt / n)
+        # Raw bytes until a full line is present: no quadratic str growth, and a UTF-8
+        # sequence split across two reads is decoded intact
+        buf = bytearray()
+        monotonic = time.monotonic
+        # One clock read per iteration, shared by the deadline check and PPK sample timing
+        while (now := monotonic()) < deadline:
+            got_input = ser.in_waiting > 0
+            if got_input:
+                buf.extend(ser.read(ser.in_waiting))
+                start = 0
+                while True:
+                    nl = buf.find(b'\n', start)
+                    if nl < 0:
+                        break
+                    raw = buf[start:nl]
+                    start = nl + 1
+                    if VERBOSE_SERIAL:
+                        text = raw.decode('utf-8', errors='ignore').strip()
+                        if text:
+                            _print(f"[RX] {text}")
+                    # Log chatter during the sequence is skipped without decoding or JSON parsing;
+                    # only the reply carries the quoted command name
+                    if b'"measure_sequence"' not in raw:
                         continue
                     try:
-                        obj = json.loads(line)
+                        obj = _json_loads(raw.decode('utf-8', errors='ignore'))
                         if obj.get("command") == "measure_sequence" and obj.get("status"):
                             # Attach PPK averages if available
                             if ppk_windows is not None:
-                                for key in ('idle', 'pump_on', 'valve_on'):
-                                    w = ppk_windows.get(key) or {}
-                                    cnt = w.get('count') or 0
-                                    if cnt > 0:
-                                        avg_ma = (w.get('sum_ua', 0.0) / cnt) / 1000.0
-                                        v_v = (w.get('v_mv') or 0) / 1000.0
-                                        obj.setdefault(key, {})['ppk_current_mA'] = avg_ma
-                                        obj.setdefault(key, {})['ppk_voltage_v'] = v_v
-                                        # Also include min/max within the middle window
-                                        min_ma = (w.get('min_ua') / 1000.0) if w.get('min_ua') is not None else None
-                                        max_ma = (w.get('max_ua') / 1000.0) if w.get('max_ua') is not None else None
-                                        if min_ma is not None:
-                                            obj.setdefault(key, {})['ppk_min_mA'] = min_ma
-                                        if max_ma is not None:
-                                            obj.setdefault(key, {})['ppk_max_mA'] = max_ma
+                                # PPK output voltage is fixed for the whole sequence
+                                v_v = (GLOBAL_PPK_VOLTAGE_MV or 0) / 1000.0
+                                for key, w in ppk_windows.items():
+                                    if w.count <= 0:
+                                        continue
+                                    fields = {'ppk_current_mA': (w.sum_ua / w.count) / 1000.0,
+                                              'ppk_voltage_v': v_v}
+                                    # Also include min/max within the middle window
+                                    if w.min_ua is not None:
+                                        fields['ppk_min_mA'] = w.min_ua / 1000.0
+                                    if w.max_ua is not None:
+                                        fields['ppk_max_mA'] = w.max_ua / 1000.0
+                                    phase = obj.get(key)
+                                    if isinstance(phase, dict):
+                                        phase.update(fields)
+                                    else:
+                                        obj[key] = fields
                             return obj
                     except Exception:
                         continue
-            # Poll PPK as fast as practical
-            _ppk_update()
-            time.sleep(0.001)
+                del buf[:start]
+            # Poll PPK as fast as practical; only wait when this pass found no serial input
+            # (a partial line is likely followed by the rest), and input cuts the wait short
+            _ppk_update(now)
+            if not got_input:
+                _wait_serial_readable(ser, 0.001 if ppk is not None else 0.01)
         return None
     finally:
+        _set_windows_timer_resolution(False)
         try:
             ser.close()
         except Exception:
@@ -1460,39 +1811,93 @@ def send_sleep_command(port: str, timeout_s: float = 3.0, seconds: int = 0, defe
     """
     if serial is None:
         return False
-    params = AutoTQDeviceProgrammer.SERIAL_PARAMS
-    ser = None
+    # _open_serial_safely reports failure as None rather than raising
+    ser = _open_serial_safely(port, _SERIAL_PARAMS)
+    if ser is None:
+        return False
     try:
-        ser = _open_serial_safely(port, params)
-        if ser is None:
-            return False
         time.sleep(0.05)
-        cmd = {"command": "shutdown", "seconds": int(seconds), "defer_until_usb_unplug": bool(defer_until_usb_unplug)}
         try:
+            payload = (_CMD_SHUTDOWN_FMT % (int(seconds), 'true' if defer_until_usb_unplug else 'false')).encode('ascii')
             ser.reset_output_buffer()
-            ser.write((json.dumps(cmd) + "\n").encode("utf-8"))
+            ser.write(payload)
             ser.flush()
-            time.sleep(0.05)
         except Exception:
             return False
-        # Optionally wait briefly for any ack
+        time.sleep(0.05)
+        # Optionally wait briefly for any ack; one guard around the whole drain, not one per poll.
+        # Non-blocking read(4096) returns whatever is buffered in a single call (no in_waiting query)
         t_end = time.time() + max(0.2, timeout_s)
-        while time.time() < t_end:
-            try:
-                if ser.in_waiting > 0:
-                    _ = ser.read(ser.in_waiting)
-            except Exception:
-                break
-            time.sleep(0.05)
-        return True
-    except Exception:
-        return False
-    finally:
+        read = ser.read
         try:
-            if ser:
-                ser.close()
-        except Exception:
+            ser.timeout = 0
+            while time.time() < t_end:
+                if not read(4096):
+                    time.sleep(0.02)
+        except (serial.SerialException, OSError):
             pass
+        return True
+    finally:
+        with suppress(Exception):
+            ser.close()
+
+
+# Live PPK plot: vertices handed to matplotlib per frame, and minimum seconds between frames
+_LIVE_PLOT_MAX_POINTS = 2000
+_LIVE_PLOT_FRAME_S = 0.05
+
+
+def _minmax_envelope(xs, ys, max_points: int) -> Tuple[Any, Any]:
+    """Downsample time-ordered (xs, ys) to <= ~max_points as per-bucket (min, max) pairs.
+
+    Each bucket contributes its low and high value, so the drawn trace keeps the full
+    amplitude envelope (spikes included) at screen resolution. Results are fresh packed
+    arrays: matplotlib converts them with one buffer copy instead of iterating floats, and
+    the caller's growing buffers are never exported (array.array cannot resize while viewed).
+    """
+    n = len(ys)
+    if n <= max_points:
+        return xs[:], ys[:]
+    bucket = -(-n // (max_points // 2))
+    out_x = array('d')
+    out_y = array('d')
+    for i in range(0, n, bucket):
+        j = min(n, i + bucket)
+        chunk = ys[i:j]
+        out_x.append(xs[i])
+        out_y.append(min(chunk))
+        out_x.append(xs[j - 1])
+        out_y.append(max(chunk))
+    return out_x, out_y
+
+
+def _reduce_ppk_chunk(samples, rel0: float, dt_per: float,
+                      discard_s: float) -> Tuple[float, float, int, Optional[float], Optional[float]]:
+    """Reduce one evenly spaced PPK chunk to (rel_end, sum_uA, count, min_uA, max_uA).
+
+    Sample k (0-based) lands at rel0 + (k + 1) * dt_per, so samples before discard_s form a
+    prefix found in O(1); sum/min/max then run over the remaining slice as builtin C loops.
+    """
+    n = len(samples)
+    rel_end = rel0 + n * dt_per
+    # Once past the window every sample counts and the index math is skipped
+    k0 = 0 if rel0 >= discard_s else max(0, math.ceil((discard_s - rel0) / dt_per) - 1)
+    if k0 >= n:
+        return rel_end, 0.0, 0, None, None
+    kept = samples[k0:] if k0 else samples
+    return rel_end, float(sum(kept)), n - k0, float(min(kept)), float(max(kept))
+
+
+def _nice_ceil(value: float) -> float:
+    """Smallest 1-2-5 x 10^k step >= value (axis limits that move rarely, in readable steps)."""
+    if value <= 0:
+        return 1.0
+    base = 10.0 ** math.floor(math.log10(value))
+    for step in (1.0, 2.0, 5.0, 10.0):
+        if base * step >= value:
+            return base * step
+    return base * 10.0
+
 
 def run_ppk_sleep_measure(duration_s: float = 3.0, live_plot: bool = False, discard_initial_s: float = 0.0) -> Optional[Dict[str, Any]]:
     """Measure average current using PPK only for a quiet/sleep window.
@@ -1508,7 +1913,9 @@ def run_ppk_sleep_measure(duration_s: float = 3.0, live_plot: bool = False, disc
             ppk.start_measuring()
         except Exception:
             pass
-        t_end = time.time() + max(0.2, duration_s)
+        # Monotonic clock: an NTP step mid-window cannot skew dt_per or the deadline
+        monotonic = time.monotonic
+        t_end = monotonic() + max(0.2, duration_s)
         sum_ua = 0.0
         cnt = 0
         min_ua = None
@@ -1517,14 +1924,28 @@ def run_ppk_sleep_measure(duration_s: float = 3.0, live_plot: bool = False, disc
         fig = None
         ax = None
         line = None
-        xs: list = []
-        ys: list = []
-        t0 = time.time()
+        # Packed buffers instead of a boxed float + list slot per point; matplotlib reads them
+        # through the buffer protocol. Times stay double; currents are float32 (4 B/point),
+        # ample for a plotted trace (stats are accumulated separately in double)
+        xs = array('d')
+        ys = array('f')
+        t0 = monotonic()
         last_fetch_time: Optional[float] = None
         rel_time_s: float = 0.0  # advances regardless of live_plot
-        if live_plot and HAS_MPL:
+        peak_ma = 0.0
+        last_draw = 0.0
+        # Blitting: the axes background (ticks, labels) is cached as pixels and only the trace
+        # is re-rendered per frame; the cache is rebuilt only when the limits change
+        blit = False
+        bg = None
+        cur_lims: Optional[Tuple[float, float]] = None
+        discard_floor_s = max(0.0, discard_initial_s)
+        # Empty reads back off 1 -> 20 ms (doubling) and snap back on data, so an idle meter
+        # costs ~50 wakeups/s instead of 1000 while a streaming one is drained promptly
+        idle_wait_s = 0.001
+        _plt = _get_plt() if live_plot else None
+        if _plt is not None:
             try:
-                import matplotlib.pyplot as _plt  # type: ignore
                 _plt.ion()
                 fig, ax = _plt.subplots(1, 1)
                 ax.set_title("PPK Sleep Current (mA)")
@@ -1533,20 +1954,36 @@ def run_ppk_sleep_measure(duration_s: float = 3.0, live_plot: bool = False, disc
                 line, = ax.plot([], [], lw=1.0)
                 ax.set_xlim(0, duration_s)
                 ax.set_ylim(0, 5)
+                cur_lims = (duration_s, 5.0)
+                blit = bool(getattr(fig.canvas, 'supports_blit', False))
+                # Animated artists are skipped by full draws and painted by draw_artist()
+                line.set_animated(blit)
+                # Full layout once up front; per-frame updates only flush pending draws
+                fig.canvas.draw()
+                if blit:
+                    bg = fig.canvas.copy_from_bbox(ax.bbox)
             except Exception:
                 fig = None
                 ax = None
                 line = None
-        while time.time() < t_end:
-            try:
-                data_chunk = ppk.get_data()
-                if not data_chunk:
-                    time.sleep(0.001)
-                    continue
-                samples, _ = ppk.get_samples(data_chunk)
-                now = time.time()
-                n = len(samples or [])
-                if n > 0:
+        # Plot points travel from the sampler to the drawing loop as (xs, ys, peak_mA) chunks
+        plot_q: Optional[Queue] = Queue() if line is not None else None
+
+        def _sampler() -> None:
+            nonlocal sum_ua, cnt, min_ua, max_ua, last_fetch_time, rel_time_s, idle_wait_s
+            # One clock read per iteration, shared by the deadline check and sample timing
+            while (now := monotonic()) < t_end:
+                try:
+                    data_chunk = ppk.get_data()
+                    if not data_chunk:
+                        time.sleep(idle_wait_s)
+                        idle_wait_s = min(0.02, idle_wait_s * 2)
+                        continue
+                    idle_wait_s = 0.001
+                    samples, _ = ppk.get_samples(data_chunk)
+                    n = len(samples or [])
+                    if n == 0:
+                        continue
                     # Distribute samples uniformly across time since last fetch
                     if last_fetch_time is None:
                         dt = max(0.001, now - t0)
@@ -1554,52 +1991,83 @@ def run_ppk_sleep_measure(duration_s: float = 3.0, live_plot: bool = False, disc
                         dt = max(0.001, now - last_fetch_time)
                     last_fetch_time = now
                     dt_per = dt / n
-                    for _idx, ua in enumerate(samples or []):
-                        val = float(ua)
-                        rel_time_s += dt_per
-                        # Accumulate stats only after discard window
-                        if rel_time_s >= max(0.0, discard_initial_s):
-                            sum_ua += val
-                            cnt += 1
-                            if min_ua is None or val < min_ua:
-                                min_ua = val
-                            if max_ua is None or val > max_ua:
-                                max_ua = val
-                        if live_plot and line is not None:
-                            xs.append(rel_time_s)
-                            ys.append(val / 1000.0)
-                    if live_plot and line is not None:
-                        try:
-                            # Update plot
-                            line.set_data(xs, ys)
-                            if ax is not None:
-                                ax.set_xlim(0, max(duration_s, xs[-1] if xs else duration_s))
-                                # Auto-scale Y to data range with some headroom
-                                ymin = 0.0
-                                ymax = max(5.0, max(ys) * 1.1 if ys else 5.0)
-                                ax.set_ylim(ymin, ymax)
-                            import matplotlib.pyplot as _plt  # type: ignore
-                            _plt.pause(0.001)
-                        except Exception:
-                            pass
-            except Exception:
-                time.sleep(0.001)
-                continue
+                    rel_start = rel_time_s
+                    rel_time_s, chunk_sum, chunk_cnt, lo_ua, hi_ua = _reduce_ppk_chunk(
+                        samples, rel_start, dt_per, discard_floor_s)
+                    if chunk_cnt:
+                        sum_ua += chunk_sum
+                        cnt += chunk_cnt
+                        min_ua = lo_ua if min_ua is None else min(min_ua, lo_ua)
+                        max_ua = hi_ua if max_ua is None else max(max_ua, hi_ua)
+                    if plot_q is not None:
+                        plot_q.put(([rel_start + (k + 1) * dt_per for k in range(n)],
+                                    [ua * 0.001 for ua in samples],
+                                    float(max(samples)) / 1000.0))
+                except Exception:
+                    time.sleep(0.001)
+
+        if plot_q is None:
+            _sampler()
+        else:
+            # Drain the meter on a worker so a slow redraw never delays get_data(); this thread
+            # only consumes queued chunks and draws
+            sampler = threading.Thread(target=_sampler, daemon=True)
+            sampler.start()
+            while sampler.is_alive() or not plot_q.empty():
+                try:
+                    item = plot_q.get(timeout=_LIVE_PLOT_FRAME_S)
+                except Empty:
+                    continue
+                while item is not None:
+                    xs.extend(item[0])
+                    ys.extend(item[1])
+                    peak_ma = max(peak_ma, item[2])
+                    try:
+                        item = plot_q.get_nowait()
+                    except Empty:
+                        item = None
+                # Redraw at most every _LIVE_PLOT_FRAME_S with a min/max envelope; redraw cost
+                # scales with vertex count, not with how many samples arrived
+                now = monotonic()
+                if now - last_draw < _LIVE_PLOT_FRAME_S:
+                    continue
+                last_draw = now
+                try:
+                    # Update plot
+                    line.set_data(*_minmax_envelope(xs, ys, _LIVE_PLOT_MAX_POINTS))
+                    # Auto-scale Y to data range with some headroom, snapped to 1-2-5 steps so
+                    # the limits (and the blit background) change only a few times per run
+                    lims = (max(duration_s, xs[-1] if xs else duration_s), max(5.0, _nice_ceil(peak_ma * 1.1)))
+                    if lims != cur_lims:
+                        cur_lims = lims
+                        ax.set_xlim(0, lims[0])
+                        ax.set_ylim(0.0, lims[1])
+                        if blit:
+                            fig.canvas.draw()
+                            bg = fig.canvas.copy_from_bbox(ax.bbox)
+                    if blit and bg is not None:
+                        fig.canvas.restore_region(bg)
+                        ax.draw_artist(line)
+                        fig.canvas.blit(ax.bbox)
+                    else:
+                        fig.canvas.draw_idle()
+                    fig.canvas.flush_events()
+                except Exception:
+                    pass
+            sampler.join()
         if cnt == 0:
             return None
-        avg_ma = (sum_ua / cnt) / 1000.0
-        v_v = (GLOBAL_PPK_VOLTAGE_MV or 0) / 1000.0
+        # cnt > 0 means at least one chunk was reduced, which always sets min_ua/max_ua too
         measured = {
-            'ppk_voltage_v': v_v,
-            'ppk_current_mA': avg_ma,
-            'ppk_min_mA': (min_ua / 1000.0) if min_ua is not None else None,
-            'ppk_max_mA': (max_ua / 1000.0) if max_ua is not None else None,
+            'ppk_voltage_v': (GLOBAL_PPK_VOLTAGE_MV or 0) / 1000.0,
+            'ppk_current_mA': sum_ua / cnt / 1000.0,
+            'ppk_min_mA': min_ua / 1000.0,
+            'ppk_max_mA': max_ua / 1000.0,
             'window_s': duration_s,
         }
         # Close plot window if we created one
-        if live_plot and HAS_MPL and fig is not None:
+        if _plt is not None and fig is not None:
             try:
-                import matplotlib.pyplot as _plt  # type: ignore
                 _plt.ioff()
                 _plt.show(block=False)
                 _plt.close(fig)
@@ -1617,15 +2085,18 @@ def post_power_test(client: AutoTQClient, pcb_id: int, measured: Dict[str, Any],
         'status': 'pass',
         'result_summary': {'type': 'power', 'run_index': run_index}
     }
-    r = client.session.post(f"{client.base_url}/pcbs/{pcb_id}/tests/power", json=body, timeout=15)
+    # Rides the client's pooled keep-alive session: no new TCP/TLS handshake per upload
+    r = client.session.post(f"{client.base_url}/pcbs/{pcb_id}/tests/power", data=_json_dumps(body),
+                            headers=_JSON_HEADERS, timeout=15)
     if r.status_code in (200, 201):
-        tid = r.json().get('id')
+        tid = _json_loads(r.content).get('id')
         print(f"[TEST] power id={tid} run={run_index}")
     else:
         try:
-            detail = r.json().get('detail')
+            detail = _json_loads(r.content).get('detail')
         except Exception:
-            detail = r.text
+            # Non-JSON error page: show a bounded prefix instead of decoding the whole body
+            detail = r.content[:512].decode('utf-8', 'replace')
         print(f"[TEST-ERR] power -> {r.status_code} {detail}")
 
 
@@ -7,11 +7,14 @@ import os
 import sys
 import json
 import argparse
-import time
+import atexit
+import functools
 import shutil
 import hashlib
 import signal
 import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any, List
@@ -41,9 +44,90 @@ except ImportError:
     HAS_CRYPTO = False
     print("⚠️  Warning: cryptography not installed. Credential storage will be disabled.")
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # Fall back to stdlib json
+
 # Import our existing client
 from autotq_client import AutoTQClient
 
+# Host facts, looked up once at import (platform.* can shell out on some Windows builds)
+_SYSTEM = platform.system()
+_RELEASE = platform.release()
+_NODE = platform.node()
+_PLATFORM = _SYSTEM.lower()
+_IS_WIN = _PLATFORM == "windows"
+_IS_LINUX = _PLATFORM == "linux"
+_IS_MAC = _PLATFORM == "darwin"
+_PLATFORM_BANNER = f"{_SYSTEM} {_RELEASE}"
+
+# Concurrent audio downloads (matches the client's keep-alive pool headroom)
+AUDIO_DOWNLOAD_WORKERS = 4
+# Bytes per read/write when streaming a download to disk
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# JSON <-> UTF-8 bytes; files are therefore opened in binary mode
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _json_dumps(obj: Any, indent: bool = False) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else None)
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+
+@functools.lru_cache(maxsize=4)
+def _derive_key(password: str, salt: bytes) -> bytes:
+    """PBKDF2-SHA256 (100k iterations) Fernet key; deterministic, so derived once per process."""
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt,
+        iterations=100000,
+    )
+    return base64.urlsafe_b64encode(kdf.derive(password.encode()))
+
+
+def _file_sha256(path: Path) -> str:
+    """Hex SHA-256 of a file; hashlib.file_digest (3.11+) keeps the read loop inside OpenSSL"""
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        h = hashlib.sha256()
+        for block in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            h.update(block)
+        return h.hexdigest()
+
+
+def _preallocate(f, size: int):
+    """Reserve size bytes for f up front so the filesystem can pick one extent; best effort"""
+    try:
+        if hasattr(os, 'posix_fallocate'):
+            os.posix_fallocate(f.fileno(), 0, size)
+        else:
+            # Windows: extending the file sets its end-of-file (SetEndOfFile) in one go
+            f.truncate(size)
+    except OSError:
+        pass
+
+
+def _win_pid_alive(pid: int) -> bool:
+    """OpenProcess + GetExitCodeProcess: a local syscall, no tasklist.exe round trip"""
+    import ctypes
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+    if not handle:
+        # ERROR_ACCESS_DENIED: the process exists but belongs to another user/protected context
+        return ctypes.get_last_error() == 5
+    try:
+        code = ctypes.c_ulong()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+            return False
+        return code.value == 259  # STILL_ACTIVE
+    finally:
+        kernel32.CloseHandle(handle)
+
 class AutoTQSetup:
     def __init__(self, base_url: str = None, verify_ssl: bool = True, output_dir: str = None):
         """
@@ -66,19 +150,42 @@ class AutoTQSetup:
         self.api_key_file = self.output_dir / ".autotq_api_key_encrypted"  # encrypted storage
         self.api_key_json_file = self.output_dir / "autotq_token.json"  # plain JSON storage
         self.lock_file = self.output_dir / "autotq_setup.lock"
+        self.http_cache_file = self.output_dir / ".autotq_http_cache.json"  # ETags, kept out of the manifest
+        # Salt and Fernet instances are read/built on first use and reused for the run
+        self._salt: Optional[bytes] = None
+        self._fernets: Dict[str, Any] = {}
+        # (st_mtime_ns, parsed) of the manifest file; re-parsed only when the file changes
+        self._manifest_cache: Optional[tuple] = None
+        # ETag (and, for the audio list, its filenames) per endpoint; persisted in http_cache_file
+        # so unchanged server data comes back as a bodiless 304 on the next run
+        self._http_cache: Dict[str, Any] = {}
+        # Cleared once a download HEAD proves useless (not routed, or no ETag) so later files
+        # skip the extra round trip; the prefix it resolved ('/api/v1' or legacy '') is kept
+        self._head_useful = True
+        self._download_prefix = '/api/v1'
         
         # Platform detection
-        self.current_platform = platform.system().lower()
+        self.current_platform = _PLATFORM  # kept for callers; module code uses _IS_*
         
         # Create directories
         self.firmware_dir.mkdir(exist_ok=True)
         self.audio_dir.mkdir(exist_ok=True)
         
-        # Logging
+        # Logging (downloads run on worker threads; keep each console/file line whole)
         self.log_file = self.output_dir / "autotq_setup.log"
+        # Re-entrant: the signal handler logs, and may interrupt a log() call on this thread
+        self._log_lock = threading.RLock()
+        # Held open for the run with a 64 KiB buffer instead of open/append/close per line;
+        # flushed when the lock is released and closed at exit
+        try:
+            self._log_fp = open(self.log_file, "a", encoding="utf-8", buffering=64 * 1024)
+            atexit.register(self._log_fp.close)
+        except OSError as e:
+            self._log_fp = None
+            print(f"⚠️  Warning: Could not write to log file: {e}")
         
         # Platform-specific setup
-        if self.current_platform == "windows":
+        if _IS_WIN:
             # On Windows, handle different signal types
             signal.signal(signal.SIGINT, self._signal_handler)
             try:
@@ -94,6 +201,7 @@ class AutoTQSetup:
         """Clean up on signal"""
         self.log("\nReceived interrupt signal, cleaning up...", "WARNING")
         self.release_lock()
+        self.flush_log()
         sys.exit(1)
     
     # -------- API helpers: try /api/v1 first, then legacy path --------
@@ -112,9 +220,53 @@ class AutoTQSetup:
     def _api_get(self, path: str, **kwargs):
         return self._api_request('GET', path, **kwargs)
     
+    def _api_get_conditional(self, cache_key: str, path: str, have_local: bool = True, **kwargs):
+        """GET with If-None-Match from the last ETag seen for cache_key; returns (response, cached entry).
+        Pass have_local=False when the local copy is gone so a 304 can't leave us without one."""
+        entry = self._http_cache.get(cache_key) or {}
+        if entry.get('etag') and have_local:
+            headers = dict(kwargs.pop('headers', None) or {})
+            headers['If-None-Match'] = entry['etag']
+            kwargs['headers'] = headers
+        return self._api_get(path, **kwargs), entry
+    
+    def _probe_download(self, path: str):
+        """HEAD the API path (v1 first); returns (streaming URL, HEAD response or None)"""
+        base = self.client.base_url.rstrip('/')
+        normalized = '/' + path.lstrip('/')
+        if not self._head_useful:
+            return f"{base}{self._download_prefix}{normalized}", None
+        try:
+            head = self._api_request('HEAD', path, timeout=10, allow_redirects=True)
+        except Exception:
+            return f"{base}{self._download_prefix}{normalized}", None
+        if head.status_code in (405, 501) or (head.status_code == 200 and not head.headers.get('ETag')):
+            self._head_useful = False
+            self._download_prefix = '/api/v1' if head.url.startswith(f"{base}/api/v1/") else ''
+            self.log("Server HEAD gives no ETag; existing files are kept without change checks", "INFO")
+            return head.url, None
+        return head.url, head
+    
+    def _changed_on_server(self, head, file_path: Path, cache_key: str) -> bool:
+        """True only when a usable HEAD shows the existing local file differs from the server:
+        another Content-Length, or an ETag other than the one recorded at download time.
+        Without a usable HEAD (or a recorded ETag) nothing is known, so the file is kept."""
+        if head is None or head.status_code != 200:
+            return False
+        etag = head.headers.get('ETag')
+        length = head.headers.get('Content-Length')
+        if length and not head.headers.get('Content-Encoding'):
+            try:
+                if int(length) != file_path.stat().st_size:
+                    return True
+            except (ValueError, OSError):
+                pass
+        recorded = (self._http_cache.get(cache_key) or {}).get('etag')
+        return bool(etag and recorded and etag != recorded)
+    
     def check_system_requirements(self) -> bool:
         """Check system requirements and dependencies"""
-        self.log(f"Checking system requirements on {platform.system()}...", "PROGRESS")
+        self.log(f"Checking system requirements on {_SYSTEM}...", "PROGRESS")
         
         # Check Python version
         if sys.version_info < (3, 8):
@@ -123,15 +275,15 @@ class AutoTQSetup:
         self.log(f"✓ Python {sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro} ({platform.architecture()[0]})", "SUCCESS")
         
         # Platform-specific information
-        if self.current_platform == "windows":
-            self.log(f"✓ Windows {platform.release()} detected", "SUCCESS")
-        elif self.current_platform == "linux":
+        if _IS_WIN:
+            self.log(f"✓ Windows {_RELEASE} detected", "SUCCESS")
+        elif _IS_LINUX:
             try:
                 import distro
                 self.log(f"✓ Linux {distro.name()} {distro.version()} detected", "SUCCESS")
             except ImportError:
-                self.log(f"✓ Linux {platform.release()} detected", "SUCCESS")
-        elif self.current_platform == "darwin":
+                self.log(f"✓ Linux {_RELEASE} detected", "SUCCESS")
+        elif _IS_MAC:
             self.log(f"✓ macOS {platform.mac_ver()[0]} detected", "SUCCESS")
         
         # Check disk space (require at least 500MB)
@@ -173,7 +325,7 @@ class AutoTQSetup:
         if missing_packages:
             install_cmd = f"pip install {' '.join(missing_packages)}"
             self.log(f"Install missing packages: {install_cmd}", "ERROR")
-            if self.current_platform == "windows":
+            if _IS_WIN:
                 self.log("💡 On Windows, you may need to run as Administrator", "INFO")
             return False
         
@@ -189,7 +341,7 @@ class AutoTQSetup:
                 self.log(f"✓ {package}: {description}", "SUCCESS")
             else:
                 self.log(f"⚠ {package}: {description} (Optional, but recommended)", "WARNING")
-                if self.current_platform == "windows":
+                if _IS_WIN:
                     self.log(f"💡 Install with: pip install {package}", "INFO")
         
         self.log("System requirements check completed", "SUCCESS")
@@ -233,6 +385,7 @@ class AutoTQSetup:
                 self.log("Released lock", "SUCCESS")
         except Exception as e:
             self.log(f"Could not remove lock file: {e}", "WARNING")
+        self.flush_log()
     
     def is_process_running(self, pid: int) -> bool:
         """Check if a process with given PID is running"""
@@ -241,47 +394,44 @@ class AutoTQSetup:
         else:
             # Fallback method - platform specific
             try:
-                if self.current_platform == "windows":
+                if _IS_WIN:
                     # On Windows, os.kill with signal 0 doesn't work the same way
-                    # Use tasklist command as fallback
-                    import subprocess
-                    result = subprocess.run(
-                        ["tasklist", "/FI", f"PID eq {pid}"],
-                        capture_output=True,
-                        text=True,
-                        timeout=5
-                    )
-                    return str(pid) in result.stdout
+                    return _win_pid_alive(pid)
                 else:
                     # Unix-like systems
                     os.kill(pid, 0)
                     return True
-            except (OSError, subprocess.TimeoutExpired, FileNotFoundError):
+            except PermissionError:
+                return True  # exists, owned by another user
+            except OSError:
                 return False
     
+    def _get_salt(self) -> bytes:
+        """Read (or create) the salt file once per run"""
+        if self._salt is None:
+            # Use a salt stored in the credentials file or generate one
+            salt_file = self.output_dir / ".autotq_salt"
+            if salt_file.exists():
+                with open(salt_file, 'rb') as f:
+                    self._salt = f.read()
+            else:
+                self._salt = os.urandom(16)
+                with open(salt_file, 'wb') as f:
+                    f.write(self._salt)
+        return self._salt
+    
     def _get_encryption_key(self, password: str) -> bytes:
         """Generate encryption key from password"""
         if not HAS_CRYPTO:
             return None
-        
-        # Use a salt stored in the credentials file or generate one
-        salt_file = self.output_dir / ".autotq_salt"
-        if salt_file.exists():
-            with open(salt_file, 'rb') as f:
-                salt = f.read()
-        else:
-            salt = os.urandom(16)
-            with open(salt_file, 'wb') as f:
-                f.write(salt)
-        
-        kdf = PBKDF2HMAC(
-            algorithm=hashes.SHA256(),
-            length=32,
-            salt=salt,
-            iterations=100000,
-        )
-        key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
-        return key
+        return _derive_key(password, self._get_salt())
+    
+    def _get_fernet(self, password: str):
+        """Fernet for password, built once (the constructor re-parses the key each time)"""
+        fernet = self._fernets.get(password)
+        if fernet is None:
+            fernet = self._fernets[password] = Fernet(self._get_encryption_key(password))
+        return fernet
     
     def save_credentials(self, username: str, password: str) -> bool:
         """Securely save credentials for future use"""
@@ -292,7 +442,7 @@ class AutoTQSetup:
         try:
             # Create a master password from system info - handle Windows user detection
             try:
-                if self.current_platform == "windows":
+                if _IS_WIN:
                     # On Windows, try multiple methods to get username
                     user = os.environ.get('USERNAME') or os.environ.get('USER') or 'default'
                 else:
@@ -301,10 +451,8 @@ class AutoTQSetup:
                 # Fallback if os.getlogin() fails (can happen in some environments)
                 user = os.environ.get('USER') or os.environ.get('USERNAME') or 'default'
             
-            system_info = f"{user}-{platform.node()}-autotq"
-            key = self._get_encryption_key(system_info)
-            
-            fernet = Fernet(key)
+            system_info = f"{user}-{_NODE}-autotq"
+            fernet = self._get_fernet(system_info)
             
             credentials = {
                 'username': username,
@@ -313,13 +461,13 @@ class AutoTQSetup:
                 'platform': self.current_platform
             }
             
-            encrypted_data = fernet.encrypt(json.dumps(credentials).encode())
+            encrypted_data = fernet.encrypt(_json_dumps(credentials))
             
             with open(self.credentials_file, 'wb') as f:
                 f.write(encrypted_data)
             
             # Set restrictive permissions (Unix-like systems only)
-            if self.current_platform != "windows":
+            if not _IS_WIN:
                 try:
                     os.chmod(self.credentials_file, 0o600)
                 except Exception as e:
@@ -348,8 +496,8 @@ class AutoTQSetup:
                 'saved_at': datetime.now().isoformat() + "Z"
             }
 
-            with open(self.api_key_json_file, 'w') as f:
-                json.dump(payload, f, indent=2)
+            with open(self.api_key_json_file, 'wb') as f:
+                f.write(_json_dumps(payload, indent=True))
 
             self.log(f"API key saved to {self.api_key_json_file}", "SUCCESS")
             return True
@@ -365,23 +513,21 @@ class AutoTQSetup:
         try:
             # Get system info same way as save_credentials
             try:
-                if self.current_platform == "windows":
+                if _IS_WIN:
                     user = os.environ.get('USERNAME') or os.environ.get('USER') or 'default'
                 else:
                     user = os.getlogin()
             except OSError:
                 user = os.environ.get('USER') or os.environ.get('USERNAME') or 'default'
             
-            system_info = f"{user}-{platform.node()}-autotq"
-            key = self._get_encryption_key(system_info)
-            
-            fernet = Fernet(key)
+            system_info = f"{user}-{_NODE}-autotq"
+            fernet = self._get_fernet(system_info)
             
             with open(self.credentials_file, 'rb') as f:
                 encrypted_data = f.read()
             
             decrypted_data = fernet.decrypt(encrypted_data)
-            credentials = json.loads(decrypted_data.decode())
+            credentials = _json_loads(decrypted_data)
             
             return credentials['username'], credentials['password']
             
@@ -394,8 +540,8 @@ class AutoTQSetup:
         # First try plain JSON file (preferred, created by autotq_login.py)
         if self.api_key_json_file.exists():
             try:
-                with open(self.api_key_json_file, 'r') as f:
-                    data = json.load(f)
+                with open(self.api_key_json_file, 'rb') as f:
+                    data = _json_loads(f.read())
                     api_key = data.get('api_key')
                     if api_key:
                         self.log(f"Loaded API key from {self.api_key_json_file}", "INFO")
@@ -407,21 +553,20 @@ class AutoTQSetup:
         if HAS_CRYPTO and self.api_key_file.exists():
             try:
                 try:
-                    if self.current_platform == "windows":
+                    if _IS_WIN:
                         user = os.environ.get('USERNAME') or os.environ.get('USER') or 'default'
                     else:
                         user = os.getlogin()
                 except OSError:
                     user = os.environ.get('USER') or os.environ.get('USERNAME') or 'default'
 
-                system_info = f"{user}-{platform.node()}-autotq"
-                key = self._get_encryption_key(system_info)
-                fernet = Fernet(key)
+                system_info = f"{user}-{_NODE}-autotq"
+                fernet = self._get_fernet(system_info)
 
                 with open(self.api_key_file, 'rb') as f:
                     encrypted_data = f.read()
                 decrypted = fernet.decrypt(encrypted_data)
-                payload = json.loads(decrypted.decode())
+                payload = _json_loads(decrypted)
                 return payload.get('api_key')
             except Exception as e:
                 self.log(f"Could not load encrypted API key: {e}", "WARNING")
@@ -442,34 +587,71 @@ class AutoTQSetup:
             "PROGRESS": "🔄 "
         }
         console_message = f"{emoji_map.get(level, '')} {message}"
-        print(console_message)
-        
-        # Write to log file
-        try:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(log_entry + "\n")
-        except Exception as e:
-            print(f"⚠️  Warning: Could not write to log file: {e}")
+        with self._log_lock:
+            print(console_message)
+            
+            # Write to log file
+            if self._log_fp is not None:
+                try:
+                    self._log_fp.write(log_entry + "\n")
+                except Exception as e:
+                    print(f"⚠️  Warning: Could not write to log file: {e}")
+    
+    def flush_log(self):
+        """Push buffered log lines to disk"""
+        with self._log_lock:
+            if self._log_fp is not None:
+                try:
+                    self._log_fp.flush()
+                except Exception:
+                    pass
     
     def load_manifest(self) -> Dict[str, Any]:
         """Load existing manifest file if it exists"""
-        if self.manifest_file.exists():
+        try:
+            mtime_ns = self.manifest_file.stat().st_mtime_ns
+        except OSError:
+            return {}
+        cached = self._manifest_cache
+        if cached is None or cached[0] != mtime_ns:
             try:
-                with open(self.manifest_file, "r") as f:
-                    return json.load(f)
+                with open(self.manifest_file, "rb") as f:
+                    cached = self._manifest_cache = (mtime_ns, _json_loads(f.read()))
             except Exception as e:
                 self.log(f"Could not load existing manifest: {e}", "WARNING")
-        return {}
+                return {}
+        # Callers add keys to the result; hand out a copy so the cached parse stays pristine
+        return dict(cached[1])
     
     def save_manifest(self, manifest_data: Dict[str, Any]):
         """Save manifest file with download information"""
         try:
-            with open(self.manifest_file, "w") as f:
-                json.dump(manifest_data, f, indent=2)
+            with open(self.manifest_file, "wb") as f:
+                f.write(_json_dumps(manifest_data, indent=True))
+            self._manifest_cache = (self.manifest_file.stat().st_mtime_ns, dict(manifest_data))
             self.log("Manifest file updated", "SUCCESS")
         except Exception as e:
             self.log(f"Could not save manifest: {e}", "ERROR")
     
+    def load_http_cache(self) -> Dict[str, Any]:
+        """Load the ETag cache; a missing or unreadable file just means unconditional requests"""
+        try:
+            with open(self.http_cache_file, "rb") as f:
+                data = _json_loads(f.read())
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+    
+    def save_http_cache(self):
+        """Persist the ETag cache (best effort; it only saves bandwidth)"""
+        if not self._http_cache:
+            return
+        try:
+            with open(self.http_cache_file, "wb") as f:
+                f.write(_json_dumps(self._http_cache))
+        except Exception as e:
+            self.log(f"Could not save HTTP cache: {e}", "WARNING")
+    
     def authenticate(self, api_key: str = None) -> bool:
         """Authenticate with the server using API key."""
         self.log("Starting authentication process", "INFO")
@@ -537,14 +719,21 @@ class AutoTQSetup:
             self.log(f"Error getting firmware versions: {e}", "ERROR")
             return None
     
-    def download_with_progress(self, url: str, file_path: Path, description: str = None) -> bool:
-        """Download a file with progress bar"""
+    def download_with_progress(self, url: str, file_path: Path, description: str = None,
+                               expected_sha256: Optional[str] = None, hasher=None) -> bool:
+        """
+        Download a file with progress bar
+        
+        Each block is fed to hasher (a hashlib object, created if only expected_sha256 is
+        given) as it is written, so verification needs no second pass over the file. On a
+        mismatch with expected_sha256 the temp file is discarded and the target left as is.
+        """
         try:
             # Ensure the parent directory exists
             file_path.parent.mkdir(parents=True, exist_ok=True)
             
             # On Windows, check for long path issues
-            if self.current_platform == "windows" and len(str(file_path.absolute())) > 260:
+            if _IS_WIN and len(str(file_path.absolute())) > 260:
                 self.log(f"Warning: Path length ({len(str(file_path.absolute()))}) may cause issues on Windows", "WARNING")
                 self.log("Consider using a shorter output directory path", "INFO")
             
@@ -564,43 +753,73 @@ class AutoTQSetup:
             # Create a temporary file first, then rename on success (atomic operation)
             temp_file = file_path.with_suffix(file_path.suffix + '.tmp')
             
+            # Read the urllib3 stream directly in 1 MiB blocks (still gunzipped if the server
+            # compressed it) rather than 8 KiB iter_content chunks: far fewer Python-level
+            # iterations, write() calls and progress updates per file
+            response.raw.decode_content = True
+            if expected_sha256 and hasher is None:
+                hasher = hashlib.sha256()
+            # Content-Length is the on-disk size only when the body is not content-encoded
+            prealloc = total_size if not response.headers.get('content-encoding') else 0
             try:
                 if HAS_TQDM and total_size > 0:
                     # Use tqdm progress bar
-                    with open(temp_file, 'wb') as f, tqdm(
+                    with open(temp_file, 'wb') as f, tqdm.wrapattr(
+                        response.raw,
+                        'read',
                         desc=desc,
                         total=total_size,
                         unit='B',
                         unit_scale=True,
                         unit_divisor=1024,
                         ncols=80
-                    ) as pbar:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                                pbar.update(len(chunk))
+                    ) as src:
+                        if prealloc:
+                            _preallocate(f, prealloc)
+                        read = src.read
+                        while True:
+                            chunk = read(DOWNLOAD_CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            f.write(chunk)
+                            if hasher is not None:
+                                hasher.update(chunk)
+                        f.truncate()  # drop any unused preallocated tail
+                        f.flush()
+                        os.fsync(f.fileno())
                 else:
                     # Fallback without progress bar
                     downloaded = 0
                     last_logged = 0
+                    read = response.raw.read
                     with open(temp_file, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                                downloaded += len(chunk)
-                                
-                                # Log progress for large files (every 5MB)
-                                if total_size > 0 and downloaded - last_logged >= 5 * 1024 * 1024:
-                                    progress = (downloaded / total_size) * 100
-                                    self.log(f"Download progress: {progress:.1f}% ({downloaded:,}/{total_size:,} bytes)", "PROGRESS")
-                                    last_logged = downloaded
+                        if prealloc:
+                            _preallocate(f, prealloc)
+                        while True:
+                            chunk = read(DOWNLOAD_CHUNK_SIZE)
+                            if not chunk:
+                                break
+                            f.write(chunk)
+                            if hasher is not None:
+                                hasher.update(chunk)
+                            downloaded += len(chunk)
+                            
+                            # Log progress for large files (every 5MB)
+                            if total_size > 0 and downloaded - last_logged >= 5 * 1024 * 1024:
+                                progress = (downloaded / total_size) * 100
+                                self.log(f"Download progress: {progress:.1f}% ({downloaded:,}/{total_size:,} bytes)", "PROGRESS")
+                                last_logged = downloaded
+                        f.truncate()
+                        f.flush()
+                        os.fsync(f.fileno())
+                
+                if expected_sha256 and hasher.hexdigest() != expected_sha256.lower():
+                    raise ValueError(f"checksum mismatch (expected {expected_sha256.lower()}, got {hasher.hexdigest()})")
                 
-                # Atomic rename - move temp file to final location
-                if self.current_platform == "windows":
-                    # On Windows, remove target file first if it exists
-                    if file_path.exists():
-                        file_path.unlink()
-                temp_file.rename(file_path)
+                # Atomic rename - move temp file to final location. os.replace overwrites an
+                # existing target atomically on Windows too; the fsync above makes sure the
+                # renamed file's data is on disk, not just its name
+                os.replace(temp_file, file_path)
                 
                 file_size = file_path.stat().st_size
                 self.log(f"Downloaded {file_path.name} ({file_size:,} bytes)", "SUCCESS")
@@ -620,7 +839,7 @@ class AutoTQSetup:
             self.log(f"Error downloading {file_path.name}: {error_msg}", "ERROR")
             
             # Provide platform-specific guidance
-            if self.current_platform == "windows":
+            if _IS_WIN:
                 if "permission denied" in error_msg.lower():
                     self.log("💡 Windows: Try running as Administrator or check if file is in use", "INFO")
                 elif "path too long" in error_msg.lower() or "filename too long" in error_msg.lower():
@@ -641,25 +860,38 @@ class AutoTQSetup:
         
         firmware_file = version_dir / f"firmware_v{version_number}.bin"
         
-        # Check if already downloaded
-        if firmware_file.exists() and not force:
+        # Download the firmware with progress bar
+        # HEAD resolves the streaming URL (versioned path preferred) without fetching the body
+        cache_key = f"firmware_binary_{firmware_id}"
+        url, head = self._probe_download(f"/firmware/versions/{firmware_id}/binary")
+        
+        # Check if already downloaded; without force, an existing copy is kept unless the
+        # server reports it changed
+        if firmware_file.exists() and not force and not self._changed_on_server(head, firmware_file, cache_key):
             self.log(f"Firmware v{version_number} already exists, skipping", "INFO")
+            firmware_info['downloaded_sha256'] = _file_sha256(firmware_file)
             return True
         
-        # Download the firmware with progress bar
-        # Build streaming URL preferring versioned path
-        probe = self._api_get(f"/firmware/versions/{firmware_id}/binary", timeout=5)
-        if probe is not None and getattr(probe, 'url', None):
-            url = probe.url
-        else:
-            url = f"{self.client.base_url.rstrip('/')}/api/v1/firmware/versions/{firmware_id}/binary"
+        # Hashed while streaming and checked against the server's checksum (when the
+        # version metadata carries one) before the file replaces any existing copy
+        sha256 = hashlib.sha256()
+        expected_sha256 = firmware_info.get('sha256')
+        if not expected_sha256:
+            # The versions API does not publish a checksum yet; only the local digest is recorded
+            self.log("No server checksum in firmware metadata; recording the local SHA-256 only", "INFO")
         success = self.download_with_progress(
             url, 
             firmware_file, 
-            f"Firmware v{version_number}"
+            f"Firmware v{version_number}",
+            expected_sha256=expected_sha256,
+            hasher=sha256
         )
         
         if success:
+            firmware_info['downloaded_sha256'] = sha256.hexdigest()
+            if head is not None and head.headers.get('ETag'):
+                self._http_cache[cache_key] = {'etag': head.headers['ETag']}
+            
             # Also download the manifest file
             self.download_firmware_manifest(firmware_id, version_dir, version_number)
         
@@ -670,11 +902,19 @@ class AutoTQSetup:
         try:
             manifest_file = version_dir / f"manifest_v{version_number}.json"
             
-            response = self._api_get(f"/firmware/versions/{firmware_id}/manifest", timeout=30)
+            cache_key = f"firmware_manifest_{firmware_id}"
+            response, _ = self._api_get_conditional(cache_key, f"/firmware/versions/{firmware_id}/manifest",
+                                                    have_local=manifest_file.exists(), timeout=30)
             
-            if response.status_code == 200:
-                with open(manifest_file, 'w') as f:
-                    f.write(response.text)
+            if response.status_code == 304 and manifest_file.exists():
+                self.log(f"Firmware manifest unchanged: {manifest_file.name}", "SUCCESS")
+            elif response.status_code == 200:
+                # Stored verbatim: raw bytes, no text decode or JSON round trip
+                with open(manifest_file, 'wb') as f:
+                    f.write(response.content)
+                etag = response.headers.get('ETag')
+                if etag:
+                    self._http_cache[cache_key] = {'etag': etag}
                 self.log(f"Firmware manifest downloaded: {manifest_file.name}", "SUCCESS")
             else:
                 self.log(f"Could not download firmware manifest (Status: {response.status_code})", "WARNING")
@@ -686,10 +926,18 @@ class AutoTQSetup:
         """Get list of available audio files"""
         try:
             self.log("Fetching audio files list", "PROGRESS")
-            response = self._api_get("/audio/files", timeout=30)
+            have_list = isinstance((self._http_cache.get('audio_files') or {}).get('body'), list)
+            response, cached = self._api_get_conditional('audio_files', "/audio/files", have_local=have_list, timeout=30)
             
+            if response.status_code == 304 and isinstance(cached.get('body'), list):
+                files = cached['body']
+                self.log(f"Audio file list unchanged ({len(files)} file(s))", "SUCCESS")
+                return files
             if response.status_code == 200:
-                files = response.json()
+                files = _json_loads(response.content)
+                etag = response.headers.get('ETag')
+                if etag:
+                    self._http_cache['audio_files'] = {'etag': etag, 'body': files}
                 self.log(f"Found {len(files)} audio file(s)", "SUCCESS")
                 return files
             else:
@@ -704,25 +952,27 @@ class AutoTQSetup:
         """Download a single audio file"""
         audio_file = self.audio_dir / filename
         
-        # Check if already downloaded
-        if audio_file.exists() and not force:
+        # Download with progress bar
+        # download_with_progress needs a full URL; a HEAD against /api/v1 first (then legacy)
+        # resolves it without transferring the file
+        cache_key = f"audio_file_{filename}"
+        url, head = self._probe_download(f"/audio/file/{filename}")
+        
+        # Check if already downloaded (kept unless the server reports it changed)
+        if audio_file.exists() and not force and not self._changed_on_server(head, audio_file, cache_key):
             self.log(f"Audio file {filename} already exists, skipping", "INFO")
             return True
-        
-        # Download with progress bar
-        # Prefer versioned path but download_with_progress needs a full URL; build via helper check
-        # Try /api/v1 first to determine availability
-        test_resp = self._api_get(f"/audio/file/{filename}", timeout=5)
-        if test_resp is not None and getattr(test_resp, 'url', None):
-            # requests.Response.url is the actual requested URL; use it directly for streaming
-            url = test_resp.url
-        else:
-            url = f"{self.client.base_url.rstrip('/')}/api/v1/audio/file/{filename}"
-        return self.download_with_progress(url, audio_file, f"Audio: {filename}")
+        if not self.download_with_progress(url, audio_file, f"Audio: {filename}"):
+            return False
+        if head is not None and head.headers.get('ETag'):
+            self._http_cache[cache_key] = {'etag': head.headers['ETag']}
+        return True
     
-    def download_all_audio_files(self, force: bool = False) -> bool:
-        """Download all available audio files"""
-        audio_files = self.get_audio_files_list()
+    def download_all_audio_files(self, force: bool = False,
+                                 audio_files: Optional[List[str]] = None) -> bool:
+        """Download all available audio files (audio_files: an already-fetched list, if any)"""
+        if audio_files is None:
+            audio_files = self.get_audio_files_list()
         if not audio_files:
             return False
         
@@ -731,13 +981,19 @@ class AutoTQSetup:
         
         self.log(f"Starting download of {total_count} audio files", "INFO")
         
-        for i, filename in enumerate(audio_files, 1):
-            self.log(f"Processing audio file {i}/{total_count}: {filename}", "PROGRESS")
-            if self.download_audio_file(filename, force):
-                success_count += 1
-            
-            # Small delay between downloads to be nice to the server
-            time.sleep(0.5)
+        # Downloads are network-bound: overlap a few at a time instead of paying each round
+        # trip back to back. The worker cap is what keeps the load on the server polite.
+        with ThreadPoolExecutor(max_workers=AUDIO_DOWNLOAD_WORKERS) as executor:
+            futures = {}
+            for i, filename in enumerate(audio_files, 1):
+                self.log(f"Processing audio file {i}/{total_count}: {filename}", "PROGRESS")
+                futures[executor.submit(self.download_audio_file, filename, force)] = filename
+            for future in as_completed(futures):
+                try:
+                    if future.result():
+                        success_count += 1
+                except Exception as e:
+                    self.log(f"Error downloading {futures[future]}: {e}", "ERROR")
         
         if success_count == total_count:
             self.log(f"All {total_count} audio files downloaded successfully", "SUCCESS")
@@ -763,24 +1019,33 @@ class AutoTQSetup:
         try:
             self.log("=" * 60, "INFO")
             self.log("AutoTQ Setup & Update Tool Started", "INFO")
-            self.log(f"Platform: {platform.system()} {platform.release()}", "INFO")
+            self.log(f"Platform: {_PLATFORM_BANNER}", "INFO")
             self.log(f"Python: {sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}", "INFO")
             self.log(f"Server: {self.client.base_url}", "INFO")
             self.log(f"Output directory: {self.output_dir.absolute()}", "INFO")
             self.log(f"Process ID: {os.getpid()}", "INFO")
-            if self.current_platform == "windows":
+            if _IS_WIN:
                 self.log(f"Working directory: {os.getcwd()}", "INFO")
             self.log("=" * 60, "INFO")
             
             # Load existing manifest
             manifest = self.load_manifest()
+            manifest.pop('http_cache', None)  # older runs kept the ETag cache in the manifest
+            self._http_cache = self.load_http_cache()
             
             # Authenticate
             if not self.authenticate(api_key):
                 self.log("Setup failed: Authentication required", "ERROR")
                 return False
             
-            user_info = self.client.get_user_profile()
+            # The profile, firmware and audio list lookups are independent round trips;
+            # issue them together so the setup waits for one RTT instead of three
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                profile_future = executor.submit(self.client.get_user_profile)
+                firmware_future = None if audio_only else executor.submit(self.get_latest_firmware_version)
+                audio_list_future = None if firmware_only else executor.submit(self.get_audio_files_list)
+            
+            user_info = profile_future.result()
             if user_info:
                 manifest['last_updated_by'] = user_info.get('username')
                 manifest['last_update_time'] = datetime.now().isoformat()
@@ -792,12 +1057,13 @@ class AutoTQSetup:
                 self.log("\n📦 FIRMWARE DOWNLOAD", "INFO")
                 self.log("-" * 30, "INFO")
                 
-                firmware_info = self.get_latest_firmware_version()
+                firmware_info = firmware_future.result()
                 if firmware_info:
                     if self.download_firmware(firmware_info, force):
                         manifest['latest_firmware'] = {
                             'version': firmware_info['version_number'],
                             'id': firmware_info['id'],
+                            'sha256': firmware_info.get('downloaded_sha256'),
                             'downloaded_at': datetime.now().isoformat()
                         }
                     else:
@@ -810,13 +1076,15 @@ class AutoTQSetup:
                 self.log("\n🔊 AUDIO FILES DOWNLOAD", "INFO")
                 self.log("-" * 30, "INFO")
                 
-                if self.download_all_audio_files(force):
+                audio_files = audio_list_future.result()
+                if audio_files and self.download_all_audio_files(force, audio_files):
                     manifest['audio_files_updated_at'] = datetime.now().isoformat()
                 else:
                     overall_success = False
             
             # Save manifest
             self.save_manifest(manifest)
+            self.save_http_cache()
             
             # Summary
             end_time = datetime.now()
@@ -832,7 +1100,7 @@ class AutoTQSetup:
             self.log(f"Log file: {self.log_file}", "INFO")
             
             # Platform-specific usage tips
-            if self.current_platform == "windows":
+            if _IS_WIN:
                 self.log("💡 Windows: Use Windows Explorer or Command Prompt to access files", "INFO")
                 # Check if firmware directories exist
                 firmware_dirs = list(self.firmware_dir.glob("v*"))
@@ -841,10 +1109,10 @@ class AutoTQSetup:
                 # Check if audio files exist
                 if list(self.audio_dir.glob("*.wav")):
                     self.log("💡 Audio files ready for AutoTQ Device Programmer", "INFO")
-            elif self.current_platform == "linux":
+            elif _IS_LINUX:
                 self.log("💡 Linux: Files are ready for programming tools", "INFO")
                 self.log(f"💡 Access via: cd {self.output_dir.absolute()}", "INFO")
-            elif self.current_platform == "darwin":
+            elif _IS_MAC:
                 self.log("💡 macOS: Files are ready for programming tools", "INFO")
                 self.log(f"💡 Access via Finder or: cd {self.output_dir.absolute()}", "INFO")
             
@@ -891,7 +1159,7 @@ Platform notes:
     parser.add_argument("--output-dir", default=".",
                        help="Directory to download files to (default: current directory)")
     parser.add_argument("--skip-existing", action="store_true",
-                       help="Skip downloading files that already exist (default: re-download all files)")
+                       help="Skip downloading files that already exist unless the server reports them changed (default: re-download all files)")
     parser.add_argument("--force", action="store_true", 
                        help="DEPRECATED: Re-download is now the default behavior. Use --skip-existing to skip files.")
     parser.add_argument("--firmware-only", action="store_true",
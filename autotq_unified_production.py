@@ -34,10 +34,8 @@ import autotq_quick_check as qc
 from autotq_quick_check import (
     _list_esp_ports,
     _wait_for_usb_reenumeration,
-    read_mac_via_status,
+    read_identity,
     read_mac,
-    read_device_info_via_serial,
-    read_fw_version_via_serial,
     ensure_pcb_stage,
     post_measure_tests,
     show_pcb_summary,
@@ -362,10 +360,10 @@ def transfer_audio_only() -> bool:
 
 
 def read_mac_and_versions(port: str) -> Tuple[str, Optional[str], Optional[str]]:
-    mac = read_mac_via_status(port) or read_mac(port) or "?"
-    dinfo = read_device_info_via_serial(port)
-    fw = dinfo.get("firmware_version") or read_fw_version_via_serial(port)
-    hw = dinfo.get("hardware_version")
+    ident = read_identity(port)
+    mac = ident.get("mac") or read_mac(port) or "?"
+    fw = ident.get("firmware_version")
+    hw = ident.get("hardware_version")
     return mac, fw, hw
 
 
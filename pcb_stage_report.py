@@ -296,6 +296,7 @@ def maybe_plot_timeseries(rows: List[Dict[str, Any]], filter_mac: Optional[str]
     fig, axes = plt.subplots(3, 1, figsize=(12, 9), sharex=True)
     import itertools
     import matplotlib.pyplot as _plt
+    from matplotlib.lines import Line2D
     cmap = _plt.get_cmap('tab10')
     for idx, key in enumerate(keys):
         ax = axes[idx]
@@ -337,7 +338,6 @@ def maybe_plot_timeseries(rows: List[Dict[str, Any]], filter_mac: Optional[str]
         ax2.set_ylabel('Voltage (V)')
         ax.set_title(f"{key} current (device •) and voltage vs time")
         # Build legend: one entry per MAC, plus markers for device/PPK and a voltage line sample
-        from matplotlib.lines import Line2D
         mac_handles = [Line2D([0], [0], marker='o', color=h.get_facecolor()[0], linestyle='None', label=str(mac)) for mac, h in handles_mac]
         style_handles = [
             Line2D([0], [0], marker='o', color='black', linestyle='None', label='Device current'),